@@ -0,0 +1,168 @@
+"""Бенчмарк обращений к БД в auth-флоу.
+
+Для register, login и refresh гоняет конкурентно запросы к БД в двух вариантах:
+прежние последовательные запросы (INSERT user + INSERT token, SELECT + DELETE + INSERT,
+SELECT + UPDATE) и текущие методы AuthService-DAO (CTE-вставка, upsert, CTE-ротация).
+Каждая итерация - отдельная сессия с commit, как в запросе. Хэширование паролей
+и JWT не входят в замер, они одинаковы в обоих вариантах. Результат - JSON с p50/p95/p99.
+
+База очищается перед заполнением, поэтому указывайте отдельную БД:
+
+    DB_NAME=fastblo_bench python -m benchmarks.auth_flows --users 1000 --requests 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable
+
+from src.auth.dao import TokenDAO
+from src.auth.schemas import RefreshTokenSave, UserSave
+from src.auth.utils import create_refresh_token
+from src.config import settings
+from src.dao.user_dao import UserDAO
+from src.db.base import async_session_maker, get_engine, dispose_engine
+from benchmarks.http_load import Stats, seed
+
+
+Flow = Callable[[int], Awaitable[None]]
+
+
+def build_flows(users: int) -> dict[str, dict[str, Flow]]:
+    counter = itertools.count(1)
+
+    def user_id(i: int) -> int:
+        return i % users + 1
+
+    def new_user() -> UserSave:
+        n = f"{next(counter)}_{os.getpid()}"
+        return UserSave(username=f"bench_auth_{n}", email=f"bench_auth_{n}@example.com", password="hash", is_active=True)
+
+    async def in_session(flow: Callable) -> None:
+        async with async_session_maker() as session:
+            await flow(UserDAO(session), TokenDAO(session))
+            await session.commit()
+
+    async def register_legacy(i):
+        async def flow(user_dao, token_dao):
+            user = await user_dao.add_one_record(values=new_user())
+            await token_dao.add_one_record(
+                values=RefreshTokenSave(refresh_token=create_refresh_token(user_id=user.id), user_id=user.id)
+            )
+        await in_session(flow)
+
+    async def register(i):
+        async def flow(user_dao, token_dao):
+            uid = await user_dao.reserve_id()
+            await token_dao.add_user_with_token(
+                user_id=uid, user=new_user(), refresh_token=create_refresh_token(user_id=uid)
+            )
+        await in_session(flow)
+
+    async def login_legacy(i):
+        async def flow(user_dao, token_dao):
+            user = await user_dao.find_one_or_none(filters={"email": f"bench_{user_id(i)}@example.com"})
+            await token_dao.delete_records(filters={"user_id": user.id})
+            await token_dao.add_one_record(
+                values=RefreshTokenSave(refresh_token=f"login_{i}_{time.time_ns()}", user_id=user.id)
+            )
+        await in_session(flow)
+
+    async def login(i):
+        async def flow(user_dao, token_dao):
+            user = await user_dao.find_one_or_none(filters={"email": f"bench_{user_id(i)}@example.com"})
+            await token_dao.upsert_token(
+                values=RefreshTokenSave(refresh_token=f"login_{i}_{time.time_ns()}", user_id=user.id)
+            )
+        await in_session(flow)
+
+    async def refresh_legacy(i):
+        async def flow(user_dao, token_dao):
+            user = await user_dao.find_one_or_none_by_id(data_id=user_id(i))
+            await token_dao.update_record(
+                values=RefreshTokenSave(refresh_token=f"refresh_{i}_{time.time_ns()}", user_id=user.id),
+                filters={"user_id": user.id},
+            )
+        await in_session(flow)
+
+    async def refresh(i):
+        async def flow(user_dao, token_dao):
+            await token_dao.rotate_refresh_token(user_id=user_id(i), refresh_token=f"refresh_{i}_{time.time_ns()}")
+        await in_session(flow)
+
+    return {
+        "register": {"legacy": register_legacy, "current": register},
+        "login": {"legacy": login_legacy, "current": login},
+        "refresh": {"legacy": refresh_legacy, "current": refresh},
+    }
+
+
+async def run_flow(flow: Flow, requests: int, concurrency: int) -> Stats:
+    stats = Stats()
+    indexes = iter(range(requests))
+
+    async def worker() -> None:
+        for i in indexes:
+            started = time.perf_counter()
+            try:
+                await flow(i)
+            except Exception:
+                stats.errors += 1
+                continue
+            stats.latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+async def run(args: argparse.Namespace) -> dict:
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], check=True)
+    await seed(users=args.users, posts_per_user=0)
+    get_engine()
+
+    flows = {}
+    for name, variants in build_flows(users=args.users).items():
+        flows[name] = {}
+        for variant, flow in variants.items():
+            stats = await run_flow(flow, args.requests, args.concurrency)
+            flows[name][variant] = stats.report()
+            print(name, variant, flows[name][variant], file=sys.stderr)
+    await dispose_engine()
+
+    return {
+        "database": settings.DB_NAME,
+        "users": args.users,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "flows": flows,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000, help="итераций на вариант")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="файл для JSON-отчета")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Бенчмарк накладных расходов горячих запросов BaseDAO.
+
+Сравнивает время вызова find_one_or_none_by_id, check_existence и find_one_or_none
+в двух вариантах: statement собирается заново на каждый вызов (как было раньше)
+и готовый statement из кэша BaseDAO. Запросы идут в одной сессии к базе из настроек,
+данные не меняются. Результат - JSON с микросекундами на вызов.
+
+    python -m benchmarks.dao_statements --calls 5000
+    DB_PREPARED_STATEMENT_CACHE_SIZE=0 python -m benchmarks.dao_statements
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy import exists, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dao.post_dao import PostDAO
+from src.dao.user_dao import UserDAO
+from src.db.base import async_session_maker, get_engine, dispose_engine
+from src.db.models import Post, User
+
+
+async def measure(call: Callable[[], Awaitable], calls: int, warmup: int) -> float:
+    for _ in range(warmup):
+        await call()
+    started = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def dynamic_calls(session: AsyncSession, user_id: int, email: str, post_id: int) -> dict[str, Callable[[], Awaitable]]:
+    async def by_id():
+        result = await session.execute(select(User).filter_by(id=user_id))
+        return result.scalar_one_or_none()
+
+    async def existence():
+        result = await session.execute(select(exists().where(Post.id == post_id)))
+        return result.scalar()
+
+    async def find_one():
+        result = await session.execute(select(User).filter_by(email=email))
+        return result.scalar_one_or_none()
+
+    return {"find_one_or_none_by_id": by_id, "check_existence": existence, "find_one_or_none": find_one}
+
+
+def cached_calls(session: AsyncSession, user_id: int, email: str, post_id: int) -> dict[str, Callable[[], Awaitable]]:
+    user_dao, post_dao = UserDAO(session), PostDAO(session)
+    return {
+        "find_one_or_none_by_id": lambda: user_dao.find_one_or_none_by_id(data_id=user_id),
+        "check_existence": lambda: post_dao.check_existence(data_id=post_id),
+        "find_one_or_none": lambda: user_dao.find_one_or_none(filters={"email": email}),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    report = {}
+    get_engine()
+    async with async_session_maker() as session:
+        user = (await session.execute(text("SELECT id, email FROM users ORDER BY id LIMIT 1"))).first()
+        post_id = await session.scalar(text("SELECT id FROM posts ORDER BY id LIMIT 1"))
+        user_id, email = user if user else (1, "missing@example.com")
+        post_id = post_id or 1
+
+        variants = {
+            "dynamic": dynamic_calls(session, user_id, email, post_id),
+            "cached": cached_calls(session, user_id, email, post_id),
+        }
+        for name in variants["dynamic"]:
+            timings = {}
+            for variant, calls in variants.items():
+                session.expunge_all()
+                timings[f"{variant}_us"] = round(await measure(calls[name], args.calls, args.warmup), 2)
+            timings["speedup"] = round(timings["dynamic_us"] / timings["cached_us"], 3)
+            report[name] = timings
+    await dispose_engine()
+    return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000, help="вызовов на вариант")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--output", help="файл для JSON-отчета")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
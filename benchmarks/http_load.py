@@ -0,0 +1,307 @@
+"""Нагрузочный бенчмарк HTTP API.
+
+Поднимает src.main:app через uvicorn против Postgres из настроек (.env / DB_*),
+прогоняет миграции, заполняет базу и гоняет каждый эндпоинт конкурентными
+httpx.AsyncClient-воркерами. Результат - JSON с RPS и p50/p95/p99 по эндпоинтам.
+
+База очищается перед заполнением, поэтому указывайте отдельную БД:
+
+    DB_NAME=fastblo_bench python -m benchmarks.http_load --users 1000 --posts-per-user 20 \\
+        --requests 500 --concurrency 32 --output bench.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import text
+
+from src.auth.utils import create_access_token, create_password_hash, create_refresh_token
+from src.config import settings
+from src.db.base import get_engine, dispose_engine
+
+
+BENCH_PASSWORD = "bench$Passw0rd"
+
+
+@dataclass
+class Scenario:
+    name: str
+    send: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+    requests: int | None = None
+
+
+@dataclass
+class Stats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+    def report(self) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def percentile(q: float) -> float | None:
+            if not count:
+                return None
+            return round(latencies[min(count - 1, int(q * count))] * 1000, 3)
+
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rejected_429": self.rejected,
+            "rps": round(count / self.elapsed, 2) if self.elapsed else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
+
+
+async def seed(users: int, posts_per_user: int) -> None:
+    password_hash = create_password_hash(BENCH_PASSWORD)
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE tokens, posts, users RESTART IDENTITY CASCADE"))
+        await conn.execute(
+            text(
+                "INSERT INTO users (username, email, password, created_at) "
+                "SELECT 'bench_' || g, 'bench_' || g || '@example.com', :password, "
+                "now() - g * interval '1 second' FROM generate_series(1, :users) AS g"
+            ),
+            {"password": password_hash, "users": users},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO posts (user_id, title, text, author, created_at) "
+                "SELECT u.id, 'title ' || p, repeat('text ', 40), u.username, "
+                "u.created_at + p * interval '1 millisecond' "
+                "FROM users AS u, generate_series(1, :posts) AS p ORDER BY u.id, p"
+            ),
+            {"posts": posts_per_user},
+        )
+        await conn.execute(
+            text("INSERT INTO tokens (refresh_token, user_id) SELECT 'seed_' || id, id FROM users")
+        )
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+    await dispose_engine()
+
+
+def build_scenarios(users: int, posts_per_user: int) -> list[Scenario]:
+    """Сценарии по всем роутерам. Пользователи делятся на диапазоны, чтобы
+    разрушающие запросы (смена пароля, деактивация) не мешали остальным"""
+    readers = max(1, users // 2)
+    counter = itertools.count(1)
+    created_post_ids: list[tuple[int, int]] = []
+    deactivate_pool = iter(range(readers + 1, users + 1))
+
+    def user_id(i: int) -> int:
+        return i % readers + 1
+
+    def auth(uid: int) -> dict:
+        return {"Authorization": f"Bearer {create_access_token(user_id=uid, username=f'bench_{uid}')}"}
+
+    def post_id(i: int) -> int:
+        return i % (readers * posts_per_user) + 1 if posts_per_user else 1
+
+    async def register(client, i):
+        n = next(counter)
+        return await client.post("/auth/register", json={
+            "username": f"bench_new_{n}_{os.getpid()}",
+            "email": f"bench_new_{n}_{os.getpid()}@example.com",
+            "password": BENCH_PASSWORD,
+            "confirm_password": BENCH_PASSWORD,
+        })
+
+    async def login(client, i):
+        uid = user_id(i)
+        return await client.post("/auth/login", data={"username": f"bench_{uid}@example.com", "password": BENCH_PASSWORD})
+
+    async def refresh(client, i):
+        client.cookies.set("user_refresh_token", create_refresh_token(user_id=user_id(i)))
+        response = await client.post("/auth/refresh")
+        client.cookies.clear()
+        return response
+
+    async def logout(client, i):
+        return await client.post("/auth/logout", headers=auth(user_id(i)))
+
+    async def create_post(client, i):
+        uid = user_id(i)
+        response = await client.post("/posts", json={"title": f"bench {i}", "text": "bench text"}, headers=auth(uid))
+        if response.status_code == 201:
+            created_post_ids.append((response.json()["id"], uid))
+        return response
+
+    async def create_posts_batch(client, i):
+        posts = [{"title": f"batch {i}-{n}", "text": "bench text"} for n in range(20)]
+        return await client.post("/posts/batch", json=posts, headers=auth(user_id(i)))
+
+    async def update_post(client, i):
+        pid = post_id(i)
+        uid = (pid - 1) // posts_per_user + 1
+        return await client.patch(f"/posts/{pid}", json={"title": f"upd {i}", "text": "updated"}, headers=auth(uid))
+
+    async def delete_post(client, i):
+        pid, uid = created_post_ids.pop()
+        return await client.delete(f"/posts/{pid}", headers=auth(uid))
+
+    async def change_username(client, i):
+        uid = user_id(i)
+        return await client.patch(f"/users/{uid}/username", json={"username": f"bench_{uid}"}, headers=auth(uid))
+
+    async def change_password(client, i):
+        uid = user_id(i)
+        return await client.patch(f"/users/{uid}/password", json={
+            "password": BENCH_PASSWORD, "new_password": BENCH_PASSWORD, "confirm_password": BENCH_PASSWORD,
+        }, headers=auth(uid))
+
+    async def deactivate(client, i):
+        uid = next(deactivate_pool)
+        return await client.patch(f"/users/{uid}/deactivate", headers=auth(uid))
+
+    return [
+        Scenario("POST /auth/register", register),
+        Scenario("POST /auth/login", login),
+        Scenario("POST /auth/refresh", refresh),
+        Scenario("POST /auth/logout", logout),
+        Scenario("GET /users", lambda c, i: c.get("/users", params={"limit": 20})),
+        Scenario("GET /users/me", lambda c, i: c.get("/users/me", headers=auth(user_id(i)))),
+        Scenario("GET /users/{id}", lambda c, i: c.get(f"/users/{user_id(i)}")),
+        Scenario("GET /users/{id}/posts", lambda c, i: c.get(f"/users/{user_id(i)}/posts", headers=auth(user_id(i)))),
+        Scenario("PATCH /users/{id}/username", change_username),
+        Scenario("PATCH /users/{id}/password", change_password),
+        Scenario("GET /posts", lambda c, i: c.get("/posts", params={"limit": 20})),
+        Scenario("GET /posts/{id}", lambda c, i: c.get(f"/posts/{post_id(i)}")),
+        Scenario("GET /posts/search", lambda c, i: c.get("/posts/search", params={"q": f"title {i % 20 + 1}", "limit": 20})),
+        Scenario("GET /posts/export", lambda c, i: c.get("/posts/export", headers=auth(1)), requests=5),
+        Scenario("POST /posts", create_post),
+        Scenario("POST /posts/batch", create_posts_batch),
+        Scenario("PATCH /posts/{id}", update_post),
+        Scenario("DELETE /posts/{id}", delete_post),
+        Scenario("PATCH /users/{id}/deactivate", deactivate, requests=users - readers),
+    ]
+
+
+async def run_scenario(base_url: str, scenario: Scenario, requests: int, concurrency: int) -> Stats:
+    stats = Stats()
+    indexes = iter(range(requests))
+
+    async def worker() -> None:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for i in indexes:
+                started = time.perf_counter()
+                try:
+                    response = await scenario.send(client, i)
+                    status = response.status_code
+                except (httpx.HTTPError, IndexError, StopIteration):
+                    status = None
+                if status is not None and status < 400:
+                    stats.latencies.append(time.perf_counter() - started)
+                elif status == 429:
+                    stats.rejected += 1
+                else:
+                    stats.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get("/health/ready")
+                if response.status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Сервер не поднялся")
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], check=True)
+    await seed(users=args.users, posts_per_user=args.posts_per_user)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.main:app",
+            "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        # Весь трафик идет с 127.0.0.1: лимиты по IP и in-flight отклоняли бы auth-запросы с 429,
+        # бенчмарк меряет сами эндпоинты. Отклоненные запросы считаются в rejected_429
+        env={**os.environ, "RATE_LIMIT_BACKEND": "none", "AUTH_MAX_CONCURRENCY": str(args.concurrency)},
+    )
+    try:
+        await wait_until_ready(base_url)
+        endpoints = {}
+        for scenario in build_scenarios(users=args.users, posts_per_user=args.posts_per_user):
+            if args.only and not any(pattern in scenario.name for pattern in args.only):
+                continue
+            requests = min(scenario.requests or args.requests, args.requests)
+            stats = await run_scenario(base_url, scenario, requests, args.concurrency)
+            endpoints[scenario.name] = stats.report()
+            print(scenario.name, endpoints[scenario.name], file=sys.stderr)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "commit": git_commit(),
+        "database": settings.DB_NAME,
+        "users": args.users,
+        "posts_per_user": args.posts_per_user,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "endpoints": endpoints,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts-per-user", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="запросов на эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=1, help="воркеров uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--only", nargs="*", help="подстроки имен эндпоинтов для запуска")
+    parser.add_argument("--output", help="файл для JSON-отчета, по умолчанию stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Профиль холодного старта: время импорта src.main.
+
+Запускает `python -X importtime -c "import src.main"` в отдельных процессах
+и собирает медиану по прогонам:
+
+- total_ms: кумулятивное время импорта src.main;
+- top: самые дорогие модули верхнего уровня (кумулятивно, вместе с зависимостями);
+- src: собственное время модулей src.* без их зависимостей.
+
+БД не нужна: движок создается в lifespan, а не при импорте.
+
+    python -m benchmarks.import_time --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+
+def import_times(module: str) -> dict[str, tuple[int, int, int]]:
+    """Один прогон в чистом процессе: {модуль: (self_us, cumulative_us, глубина)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return times
+
+
+def run(args: argparse.Namespace) -> dict:
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    self_us, cumulative_us, depth = defaultdict(list), defaultdict(list), {}
+    for times in runs:
+        for name, (own, cumulative, level) in times.items():
+            self_us[name].append(own)
+            cumulative_us[name].append(cumulative)
+            depth[name] = level
+
+    def median_ms(values: list[int]) -> float:
+        return round(statistics.median(values) / 1000, 2)
+
+    # Прямые импорты src.main и модули старта интерпретатора: их кумулятивное время не пересекается
+    top = sorted((name for name in depth if depth[name] <= 1 and name != args.module),
+                 key=lambda name: statistics.median(cumulative_us[name]), reverse=True)
+    own = sorted((name for name in depth if name.split(".")[0] == "src"),
+                 key=lambda name: statistics.median(self_us[name]), reverse=True)
+    return {
+        "module": args.module,
+        "runs": args.runs,
+        "total_ms": median_ms(cumulative_us[args.module]),
+        "top": {name: median_ms(cumulative_us[name]) for name in top[:args.top]},
+        "src": {name: median_ms(self_us[name]) for name in own[:args.top]},
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main", help="импортируемый модуль")
+    parser.add_argument("--runs", type=int, default=5, help="прогонов в отдельных процессах")
+    parser.add_argument("--top", type=int, default=15, help="модулей в каждом списке")
+    parser.add_argument("--output", help="файл для JSON-отчета")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = run(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
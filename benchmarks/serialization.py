@@ -0,0 +1,119 @@
+"""Бенчмарк сериализации списочных ответов.
+
+Для Page[PostResponse] из N постов сравнивает время получения тела ответа:
+
+- jsonable_encoder: jsonable_encoder + json.dumps, путь JSONResponse и любого
+  response_class, заданного явно;
+- orjson: jsonable_encoder + orjson.dumps, путь ORJSONResponse;
+- orjson_model_dump: orjson.dumps(model_dump()) без jsonable_encoder;
+- response_model: валидация и dump_json через response_model, как FastAPI делает
+  для эндпоинтов без response_class;
+- schema_json: SchemaJSONResponse, готовые схемы сервиса без повторной валидации.
+
+БД не нужна. Результат - JSON с миллисекундами на ответ.
+
+    python -m benchmarks.serialization --sizes 1000 10000 --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+
+from src.api.responses import SchemaJSONResponse
+from src.schemas.pagination_schema import Page
+from src.schemas.post_schema import PostResponse
+
+try:
+    import orjson
+except ImportError:  # варианты с orjson пропускаются
+    orjson = None
+
+
+def build_page(size: int) -> Page[PostResponse]:
+    updated_at = datetime.now(timezone.utc)
+    return Page[PostResponse](
+        items=[
+            PostResponse(
+                id=i, title=f"Post {i}", text="Lorem ipsum dolor sit amet. " * 20,
+                user_id=i % 100 + 1, author=f"user_{i % 100 + 1}", updated_at=updated_at,
+            )
+            for i in range(1, size + 1)
+        ],
+        next_cursor="cursor",
+    )
+
+
+def response_model_field():
+    app = FastAPI()
+
+    @app.get("/posts", response_model=Page[PostResponse])
+    async def posts(): ...
+
+    return next(route for route in app.routes if getattr(route, "path", None) == "/posts").response_field
+
+
+def variants(page: Page[PostResponse], loop: asyncio.AbstractEventLoop) -> dict[str, Callable[[], bytes]]:
+    field = response_model_field()
+    calls = {
+        "jsonable_encoder": lambda: json.dumps(jsonable_encoder(page)).encode(),
+        "response_model": lambda: loop.run_until_complete(
+            serialize_response(field=field, response_content=page, dump_json=True)
+        ),
+        "schema_json": lambda: SchemaJSONResponse(page, Page[PostResponse]).body,
+    }
+    if orjson:
+        calls["orjson"] = lambda: orjson.dumps(jsonable_encoder(page))
+        calls["orjson_model_dump"] = lambda: orjson.dumps(page.model_dump())
+    return calls
+
+
+def measure(call: Callable[[], bytes], rounds: int) -> float:
+    call()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        call()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def run(args: argparse.Namespace) -> dict:
+    report = {}
+    loop = asyncio.new_event_loop()
+    try:
+        for size in args.sizes:
+            page = build_page(size)
+            calls = variants(page, loop)
+            timings = {f"{name}_ms": round(measure(call, args.rounds), 3) for name, call in calls.items()}
+            timings["bytes"] = len(calls["schema_json"]())
+            report[str(size)] = timings
+    finally:
+        loop.close()
+    return report
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="постов в ответе")
+    parser.add_argument("--rounds", type=int, default=20, help="повторов на вариант")
+    parser.add_argument("--output", help="файл для JSON-отчета")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = run(args)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,14 +7,15 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
-from src.db.base import Base, DATABASE_URL
-from src.db.models import Post, User
+from src.config import get_settings
+from src.db.base import Base
+from src.db.models import Post, PostPurge, User
 from src.auth.models import Token
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", DATABASE_URL)
+config.set_main_option("sqlalchemy.url", get_settings().db_url)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,17 @@
+"""Shared helpers for migration scripts."""
+from alembic import op
+import sqlalchemy as sa
+
+
+def drop_invalid_index(name: str, table_name: str) -> None:
+    """Drop the index if a previous CREATE INDEX CONCURRENTLY left it INVALID.
+
+    A failed concurrent build keeps the index in the catalog, and a re-run with
+    IF NOT EXISTS would skip it. Call this inside autocommit_block() before the
+    concurrent create_index.
+    """
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar()
+    if invalid:
+        op.drop_index(name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
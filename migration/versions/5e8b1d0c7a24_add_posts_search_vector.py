@@ -0,0 +1,44 @@
+"""Add posts full-text search vector
+
+Revision ID: 5e8b1d0c7a24
+Revises: c41e7a9b2f13
+Create Date: 2025-05-15 18:02:51.662310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration.helpers import drop_invalid_index
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b1d0c7a24'
+down_revision: Union[str, None] = 'c41e7a9b2f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # adding a stored generated column rewrites posts under an ACCESS EXCLUSIVE lock
+    op.add_column('posts', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(text, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    ))
+    with op.get_context().autocommit_block():
+        drop_invalid_index('ix_posts_search_vector', 'posts')
+        op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_search_vector', table_name='posts', postgresql_using='gin', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('posts', 'search_vector')
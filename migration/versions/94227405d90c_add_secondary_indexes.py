@@ -0,0 +1,41 @@
+"""Add secondary indexes
+
+Revision ID: 94227405d90c
+Revises: 8d6cd5456f52
+Create Date: 2025-05-06 19:41:12.530918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration.helpers import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '94227405d90c'
+down_revision: Union[str, None] = '8d6cd5456f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        drop_invalid_index('ix_posts_user_id_created_at', 'posts')
+        op.create_index('ix_posts_user_id_created_at', 'posts', ['user_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        drop_invalid_index('ix_posts_created_at_id', 'posts')
+        op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        drop_invalid_index('ix_users_created_at_id', 'users')
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        drop_invalid_index('ix_tokens_user_id', 'tokens')
+        op.create_index('ix_tokens_user_id', 'tokens', ['user_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tokens_user_id', table_name='tokens', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_created_at_id', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_created_at_id', table_name='posts', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_user_id_created_at', table_name='posts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,43 @@
+"""Unique refresh token per user
+
+Revision ID: c41e7a9b2f13
+Revises: 94227405d90c
+Create Date: 2025-05-12 10:17:40.204131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration.helpers import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9b2f13'
+down_revision: Union[str, None] = '94227405d90c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep only the latest token of each user, the upsert needs a unique user_id
+    op.execute(
+        """
+        DELETE FROM tokens t
+        USING tokens newer
+        WHERE t.user_id = newer.user_id
+          AND (t.updated_at, t.id) < (newer.updated_at, newer.id)
+        """
+    )
+    with op.get_context().autocommit_block():
+        drop_invalid_index('uq_tokens_user_id', 'tokens')
+        op.create_index('uq_tokens_user_id', 'tokens', ['user_id'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_tokens_user_id', table_name='tokens', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_invalid_index('ix_tokens_user_id', 'tokens')
+        op.create_index('ix_tokens_user_id', 'tokens', ['user_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('uq_tokens_user_id', table_name='tokens', postgresql_concurrently=True, if_exists=True)
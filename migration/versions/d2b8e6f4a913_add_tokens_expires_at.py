@@ -0,0 +1,35 @@
+"""Add tokens expires_at
+
+Revision ID: d2b8e6f4a913
+Revises: a7f3c9d21b48
+Create Date: 2025-05-20 09:26:33.804517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration.helpers import drop_invalid_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8e6f4a913'
+down_revision: Union[str, None] = 'a7f3c9d21b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # now() is stable within the transaction, so the default does not rewrite the table:
+    # existing tokens expire 7 days after the migration
+    op.add_column('tokens', sa.Column('expires_at', sa.TIMESTAMP(timezone=True), server_default=sa.text("now() + interval '7 days'"), nullable=False))
+    with op.get_context().autocommit_block():
+        drop_invalid_index('ix_tokens_expires_at', 'tokens')
+        op.create_index('ix_tokens_expires_at', 'tokens', ['expires_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tokens_expires_at', table_name='tokens', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('tokens', 'expires_at')
@@ -0,0 +1,94 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+@dataclass(frozen=True)
+class Version:
+    """Валидаторы представления для условных GET-запросов"""
+    etag: str
+    last_modified: datetime | None = None
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+
+def _normalize(value):
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def make_etag(*parts, weak: bool = True) -> str:
+    """Строит ETag из частей версии. По умолчанию слабый: тело - сериализация,
+    побайтовое совпадение между релизами не гарантируется"""
+    digest = hashlib.sha1(json.dumps(_normalize(list(parts))).encode()).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def entity_version(kind: str, entity_id: int, updated_at: datetime | None) -> Version | None:
+    """Версия одной записи по (id, updated_at)"""
+    if updated_at is None:
+        return None
+    return Version(etag=make_etag(kind, entity_id, updated_at), last_modified=updated_at)
+
+
+def page_version(
+    kind: str,
+    owner_id: int,
+    owner_updated_at: datetime | None,
+    items: list[tuple[int, datetime | None]],
+    next_cursor: str | None,
+) -> Version | None:
+    """Версия страницы вложенных записей. Last-Modified не отдается:
+    удаление записи не меняет максимальный updated_at"""
+    if owner_updated_at is None:
+        return None
+    return Version(etag=make_etag(kind, owner_id, owner_updated_at, items, next_cursor))
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match сравнивается слабо: W/ не учитывается
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(request: Request, version: Version | None) -> Response | None:
+    """Возвращает 304, если версия клиента актуальна. If-Modified-Since
+    учитывается только без If-None-Match (RFC 9110)"""
+    if version is None:
+        return None
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, version.etag)
+    elif version.last_modified is not None and "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        fresh = version.last_modified.replace(microsecond=0) <= since
+    else:
+        fresh = False
+    return Response(status_code=304, headers=version.headers()) if fresh else None
+
+
+def set_version(response: Response, version: Version | None) -> None:
+    if version is not None:
+        response.headers.update(version.headers())
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live", include_in_schema=False)
+async def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+async def ready(request: Request):
+    """Готовность к трафику: пул соединений прогрет в lifespan"""
+    warmed_up = getattr(request.app.state, "ready", None)
+    if warmed_up is None or not warmed_up.is_set():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
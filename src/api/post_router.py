@@ -1,37 +1,76 @@
-from typing import Annotated
+import math
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from src.dependencies.services_dep import (
     get_post_service_with_commmit,
     get_post_service_without_commmit,
 )
-from src.schemas.post_schema import PostResponse, BasePost
+from src.schemas.post_schema import PostResponse, BasePost, PostBatchResponse, PostSearchResult
+from src.schemas.pagination_schema import Page
 from src.service.post_service import PostService
+from src.metrics.query_budget import query_budget
+from src.api.conditional import entity_version, is_conditional, not_modified, set_version
+from src.api.responses import SchemaJSONResponse
 from src.auth.dependencies import verify_current_user
+from src.config import settings
 
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 
-@router.get("", response_model=list[PostResponse])
+@router.get("", response_model=Page[PostResponse], dependencies=[query_budget(1)])
 async def get_all_posts(
     post_service: Annotated[PostService, Depends(get_post_service_without_commmit)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    after: Annotated[str | None, Query()] = None,
 ):
-    posts = await post_service.get_all_posts()
-    return posts
+    posts = await post_service.get_all_posts(limit=limit, after=after)
+    return SchemaJSONResponse(posts, Page[PostResponse])
 
 
-@router.get("/{post_id}", response_model=PostResponse)
+@router.get("/export", response_class=StreamingResponse, dependencies=[query_budget(1)])
+async def export_posts(
+    _: Annotated[dict, Depends(verify_current_user)],
+    post_service: Annotated[PostService, Depends(get_post_service_without_commmit)],
+    fetch_size: Annotated[int | None, Query(ge=1, le=10000)] = None,
+):
+    return StreamingResponse(
+        post_service.export_posts(fetch_size=fetch_size or settings.EXPORT_FETCH_SIZE),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/search", response_model=Page[PostSearchResult], dependencies=[query_budget(1)])
+async def search_posts(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    post_service: Annotated[PostService, Depends(get_post_service_without_commmit)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    after: Annotated[str | None, Query()] = None,
+):
+    posts = await post_service.search_posts(query=q, limit=limit, after=after)
+    return SchemaJSONResponse(posts, Page[PostSearchResult])
+
+
+@router.get("/{post_id}", response_model=PostResponse, dependencies=[query_budget(2)])
 async def get_post(
     post_id: int,
+    request: Request,
+    response: Response,
     post_service: Annotated[PostService, Depends(get_post_service_without_commmit)],
 ):
+    if is_conditional(request):
+        updated_at = await post_service.get_post_updated_at(post_id=post_id)
+        if cached := not_modified(request, entity_version("post", post_id, updated_at)):
+            return cached
     post = await post_service.get_post(post_id=post_id)
+    set_version(response, entity_version("post", post.id, post.updated_at))
     return post
 
 
-@router.post("", response_model=PostResponse, status_code=201)
+@router.post("", response_model=PostResponse, status_code=201, dependencies=[query_budget(1)])
 async def create_post(
     post: BasePost,
     post_service: Annotated[PostService, Depends(get_post_service_with_commmit)],
@@ -41,7 +80,22 @@ async def create_post(
     return new_post
 
 
-@router.patch("/{post_id}", response_model=PostResponse)
+@router.post(
+    "/batch",
+    response_model=PostBatchResponse,
+    status_code=201,
+    dependencies=[query_budget(math.ceil(settings.BATCH_COPY_THRESHOLD / settings.BATCH_INSERT_CHUNK_SIZE))],
+)
+async def create_posts(
+    posts: Annotated[list[dict[str, Any]], Body(min_length=1, max_length=settings.BATCH_MAX_ITEMS)],
+    post_service: Annotated[PostService, Depends(get_post_service_with_commmit)],
+    payload: Annotated[dict, Depends(verify_current_user)],
+):
+    result = await post_service.create_posts(user_id=payload["sub"], author=payload["username"], posts=posts)
+    return SchemaJSONResponse(result, PostBatchResponse, status_code=201)
+
+
+@router.patch("/{post_id}", response_model=PostResponse, dependencies=[query_budget(1)])
 async def update_post(
     post_id: int,
     post: BasePost,
@@ -52,7 +106,7 @@ async def update_post(
     return updated_post
 
 
-@router.delete("/{post_id}", response_model=dict)
+@router.delete("/{post_id}", response_model=dict, dependencies=[query_budget(1)])
 async def delete_post(
     post_id: int,
     post_service: Annotated[PostService, Depends(get_post_service_with_commmit)],
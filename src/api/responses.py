@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Any, Mapping
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from starlette.background import BackgroundTask
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+class SchemaJSONResponse(Response):
+    """JSON-ответ из уже собранных схем сервиса.
+
+    Сериализует content через TypeAdapter(schema).dump_json. Эндпоинт, вернувший
+    такой ответ, минует повторную валидацию через response_model, сам response_model
+    остается только для OpenAPI.
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        schema: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        background: BackgroundTask | None = None,
+    ):
+        self.schema = schema
+        super().__init__(content=content, status_code=status_code, headers=headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        return type_adapter(self.schema).dump_json(content)
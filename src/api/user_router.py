@@ -1,53 +1,78 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 
 from src.dependencies.services_dep import (
     get_user_service_with_commit,
     get_user_service_without_commit,
 )
-from src.schemas.user_schema import UserResponse, UserWithPosts, ChangeUsername, ChangePassword
-from src.service.user_service import UserService
+from src.schemas.user_schema import UserResponse, UserWithPosts, ChangeUsername, ChangePassword, PostPurgeResponse
+from src.schemas.pagination_schema import Page
+from src.service.user_service import UserService, POSTS_PAGE_SIZE
+from src.metrics.query_budget import query_budget
+from src.api.conditional import entity_version, page_version, is_conditional, not_modified, set_version
+from src.api.responses import SchemaJSONResponse
 from src.auth.dependencies import verify_current_user, check_owner
+from src.dependencies.admission_dep import admit_password_change
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("", response_model=list[UserResponse])
+@router.get("", response_model=Page[UserResponse], dependencies=[query_budget(1)])
 async def get_all_users(
     user_service: Annotated[UserService, Depends(get_user_service_without_commit)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    after: Annotated[str | None, Query()] = None,
 ):
-    users = await user_service.get_all_users()
-    return users
+    users = await user_service.get_all_users(limit=limit, after=after)
+    return SchemaJSONResponse(users, Page[UserResponse])
 
 
-@router.get("/me", response_model=UserResponse)
-async def get_me(user_service: Annotated[UserService, Depends(get_user_service_without_commit)], payload: Annotated[dict, Depends(verify_current_user)]):
+@router.get("/me", response_model=UserResponse, dependencies=[query_budget(1)])
+async def get_me(payload: Annotated[dict, Depends(verify_current_user)], user_service: Annotated[UserService, Depends(get_user_service_without_commit)]):
     user = await user_service.get_user_by_id(user_id=payload["sub"])
     return user
 
 
-@router.get("/{user_id}/posts", response_model=UserWithPosts)
+@router.get("/{user_id}/posts", response_model=UserWithPosts, dependencies=[query_budget(3)])
 async def get_user_with_posts(
     user_id: int,
-    user_service: Annotated[UserService, Depends(get_user_service_without_commit)],
+    request: Request,
     _: Annotated[Any, Depends(verify_current_user)],
+    user_service: Annotated[UserService, Depends(get_user_service_without_commit)],
+    limit: Annotated[int, Query(ge=1, le=100)] = POSTS_PAGE_SIZE,
+    after: Annotated[str | None, Query()] = None,
 ):
-    user = await user_service.get_user_with_posts(user_id=user_id)
-    return user
-
-
-@router.get("/{user_id}", response_model=UserResponse)
+    if is_conditional(request):
+        version = await user_service.get_user_posts_version(user_id=user_id, limit=limit, after=after)
+        if version and (cached := not_modified(request, page_version("user_posts", user_id, *version))):
+            return cached
+    user = await user_service.get_user_with_posts(user_id=user_id, limit=limit, after=after)
+    response = SchemaJSONResponse(user, UserWithPosts)
+    set_version(response, page_version(
+        "user_posts", user_id, user.updated_at, [(post.id, post.updated_at) for post in user.posts], user.next_cursor
+    ))
+    return response
+
+
+@router.get("/{user_id}", response_model=UserResponse, dependencies=[query_budget(2)])
 async def get_user_without_posts(
     user_id: int,
+    request: Request,
+    response: Response,
     user_service: Annotated[UserService, Depends(get_user_service_without_commit)],
 ):
+    if is_conditional(request):
+        updated_at = await user_service.get_user_updated_at(user_id=user_id)
+        if cached := not_modified(request, entity_version("user", user_id, updated_at)):
+            return cached
     user = await user_service.get_user_by_id(user_id=user_id)
+    set_version(response, entity_version("user", user.id, user.updated_at))
     return user
 
 
-@router.patch("/{user_id}/username", response_model=UserResponse)
+@router.patch("/{user_id}/username", response_model=UserResponse, dependencies=[query_budget(1)])
 async def change_username(
     user_id: int,
     data: ChangeUsername,
@@ -58,18 +83,19 @@ async def change_username(
     return user
 
 
-@router.patch("/{user_id}/password", response_model=UserResponse)
+@router.patch("/{user_id}/password", response_model=UserResponse, dependencies=[query_budget(2)])
 async def change_password(
     user_id: int,
     data: ChangePassword,
     user_service: Annotated[UserService, Depends(get_user_service_with_commit)],
-    _: Annotated[None, Depends(check_owner)]
+    _: Annotated[None, Depends(check_owner)],
+    __: Annotated[None, Depends(admit_password_change)],
 ):
     user = await user_service.change_password(user_id=user_id, data=data)
     return user
 
 
-@router.patch("/{user_id}/deactivate", response_model=dict)
+@router.patch("/{user_id}/deactivate", response_model=dict, dependencies=[query_budget(1)])
 async def deactivate_user(
     user_id: int,
     user_service: Annotated[UserService, Depends(get_user_service_with_commit)],
@@ -77,3 +103,13 @@ async def deactivate_user(
 ):
     await user_service.deactive_user(user_id=user_id)
     return {"message": "Use has been deactivated"}
+
+
+@router.get("/{user_id}/purge", response_model=PostPurgeResponse, dependencies=[query_budget(1)])
+async def get_post_purge(
+    user_id: int,
+    _: Annotated[None, Depends(check_owner)],
+    user_service: Annotated[UserService, Depends(get_user_service_without_commit)],
+):
+    purge = await user_service.get_post_purge(user_id=user_id)
+    return purge
@@ -1,7 +1,111 @@
-from src.db.base_dao import BaseDAO
+from datetime import timedelta
+
+from sqlalchemy import select, insert, update, delete, exists, func, literal, true, any_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+
+from src.config import settings
+from src.db.base_dao import BaseDAO, _is_unique_violation
+from src.db.models import User
 from src.auth.models import Token
+from src.auth.schemas import RefreshTokenSave, UserSave
+from src.errors.data_exeptions import Duplicate, TransactionError
 
 
 class TokenDAO(BaseDAO):
     model = Token
 
+    @staticmethod
+    def _expires_at():
+        return func.now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+    async def upsert_token(self, values: RefreshTokenSave) -> None:
+        """Сохраняет refresh-токен пользователя: INSERT ... ON CONFLICT (user_id) DO UPDATE"""
+        try:
+            stmt = pg_insert(self.model).values(**values.model_dump(), expires_at=self._expires_at())
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[self.model.user_id],
+                set_={
+                    "refresh_token": stmt.excluded.refresh_token,
+                    "expires_at": stmt.excluded.expires_at,
+                    "updated_at": func.now(),
+                },
+            )
+            await self._session.execute(stmt)
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def add_user_with_token(self, user_id: int, user: UserSave, refresh_token: str) -> None:
+        """Создает пользователя с заранее выделенным id и его refresh-токен одним запросом"""
+        try:
+            new_user = (
+                insert(User)
+                .values(id=user_id, **user.model_dump())
+                .returning(User.id)
+                .cte("new_user")
+            )
+            stmt = (
+                insert(self.model)
+                .from_select(
+                    ["refresh_token", "user_id", "expires_at"],
+                    select(literal(refresh_token), new_user.c.id, self._expires_at()),
+                )
+                .add_cte(new_user)
+            )
+            await self._session.execute(stmt)
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise Duplicate(msg=f"{User.__name__} already exists")
+            raise TransactionError()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def rotate_refresh_token(self, user_id: int, refresh_token: str) -> tuple[str | None, bool | None, bool]:
+        """Заменяет refresh-токен активного пользователя одним запросом.
+        Возвращает (username или None, если пользователя нет, is_active, токен заменен)"""
+        try:
+            user = select(User.id, User.username, User.is_active).where(User.id == user_id).cte("u")
+            rotated = (
+                update(self.model)
+                .where(self.model.user_id == user.c.id, user.c.is_active)
+                .values(refresh_token=refresh_token, expires_at=self._expires_at())
+                .returning(self.model.id)
+                .cte("rotated")
+            )
+            one = select(literal(1)).subquery("one")
+            stmt = (
+                select(user.c.username, user.c.is_active, exists().select_from(rotated))
+                .select_from(one)
+                .outerjoin(user, true())
+            )
+            result = await self._session.execute(stmt)
+            username, is_active, is_rotated = result.one()
+            return username, is_active, is_rotated
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def delete_expired(self, limit: int) -> int:
+        """Удаляет до limit истекших токенов по индексу expires_at.
+        Строки, занятые входом или обновлением токена, пропускаются до следующего прохода"""
+        try:
+            expired = (
+                select(self.model.id)
+                .where(self.model.expires_at < func.now())
+                .order_by(self.model.expires_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            # id = ANY(ARRAY(...)) удаляет по первичному ключу, с IN планировщик может выбрать hash join с полным чтением tokens
+            stmt = (
+                delete(self.model)
+                .where(self.model.id == any_(func.array(expired.scalar_subquery())))
+                .returning(self.model.id)
+            )
+            result = await self._session.execute(stmt)
+            return len(result.scalars().all())
+        except SQLAlchemyError as e:
+            raise TransactionError()
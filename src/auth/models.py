@@ -1,9 +1,20 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index, TIMESTAMP, text
 
 from src.db.base import Base
 
 
 class Token(Base):
+    __table_args__ = (
+        Index("uq_tokens_user_id", "user_id", unique=True),
+        Index("ix_tokens_expires_at", "expires_at"),
+    )
+
     refresh_token: Mapped[str] = mapped_column(String, unique=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # TokenDAO выставляет срок из REFRESH_TOKEN_EXPIRE_DAYS, default страхует прочие вставки
+    expires_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=text("now() + interval '7 days'")
+    )
@@ -0,0 +1,78 @@
+"""Удаление истекших refresh-токенов.
+
+Запускается периодически из lifespan приложения (TOKEN_REAPER_INTERVAL, 0 отключает)
+и вручную:
+
+    python -m src.auth.reaper --batch-size 1000
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from src.auth.dao import TokenDAO
+from src.config import settings
+from src.db.base import async_session_maker, get_engine, dispose_engine
+from src.metrics.registry import Counter, registry
+
+
+logger = logging.getLogger(__name__)
+
+REAPED_TOKENS = registry.register(
+    Counter("auth_expired_tokens_reaped_total", "Истекшие refresh-токены, удаленные при очистке")
+)
+
+
+async def reap_expired_tokens(batch_size: int, max_batches: int | None = None) -> int:
+    """Удаляет истекшие токены пачками по batch_size, каждая пачка - отдельная транзакция.
+    Возвращает число удаленных строк"""
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        async with async_session_maker() as session:
+            deleted = await TokenDAO(session).delete_expired(limit=batch_size)
+            await session.commit()
+        total += deleted
+        batches += 1
+        REAPED_TOKENS.inc(amount=deleted)
+        if deleted < batch_size:
+            break
+    return total
+
+
+async def run_token_reaper(interval: float, batch_size: int) -> None:
+    """Фоновая задача lifespan: проход раз в interval секунд.
+    Любая ошибка прохода, в том числе недоступная БД, логируется и не останавливает цикл"""
+    while True:
+        try:
+            deleted = await reap_expired_tokens(batch_size=batch_size)
+            if deleted:
+                logger.info("Reaped %s expired refresh tokens", deleted)
+        except Exception:
+            logger.exception("Expired refresh tokens reaping failed, retrying in %s s", interval)
+        await asyncio.sleep(interval)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    get_engine()
+    try:
+        deleted = await reap_expired_tokens(batch_size=args.batch_size, max_batches=args.max_batches)
+    finally:
+        await dispose_engine()
+    return {"deleted": deleted}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.TOKEN_REAPER_BATCH_SIZE, help="строк на транзакцию")
+    parser.add_argument("--max-batches", type=int, help="остановиться после стольких пачек")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
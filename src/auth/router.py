@@ -7,6 +7,8 @@ from fastapi.responses import Response
 from src.auth.dependencies import get_auth_service_with_commit, verify_current_user, get_refresh_token
 from src.auth.schemas import UserRegister, UserLogin, TokenResponse
 from src.auth.service import AuthService
+from src.metrics.query_budget import query_budget
+from src.dependencies.admission_dep import admit_login, admit_register
 
 
 router = APIRouter(prefix="/auth", tags=["User Auth"])
@@ -22,7 +24,7 @@ def set_refresh_cookie(response: Response, token: str):
     )
 
 
-@router.post("/register", response_model=TokenResponse)
+@router.post("/register", response_model=TokenResponse, dependencies=[query_budget(2), Depends(admit_register)])
 async def register(
     user: UserRegister,
     auth_service: Annotated[AuthService, Depends(get_auth_service_with_commit)],
@@ -34,7 +36,7 @@ async def register(
     return TokenResponse(access_token=tokens["access_token"])
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[query_budget(2), Depends(admit_login)])
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     auth_service: Annotated[AuthService, Depends(get_auth_service_with_commit)],
@@ -47,7 +49,7 @@ async def login(
     return TokenResponse(access_token=tokens["access_token"])
 
 
-@router.post("/refresh", response_model=TokenResponse)
+@router.post("/refresh", response_model=TokenResponse, dependencies=[query_budget(1)])
 async def refresh_tokens(
     token: Annotated[str, Depends(get_refresh_token)],
     auth_service: Annotated[AuthService, Depends(get_auth_service_with_commit)],
@@ -59,7 +61,7 @@ async def refresh_tokens(
     return TokenResponse(access_token=tokens["access_token"])
 
 
-@router.post("/logout")
+@router.post("/logout", dependencies=[query_budget(1)])
 async def logout(
     payload: Annotated[dict, Depends(verify_current_user)],
     auth_service: Annotated[AuthService, Depends(get_auth_service_with_commit)],
@@ -1,13 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models import User
 from src.dao.user_dao import UserDAO
 from src.errors.service_exeptions import InvalidCredentialsError, InvalidTokenTypeError, TokenRefreshError, UserInactiveError
 from src.errors.data_exeptions import UserNotFoundError
 from src.auth.utils import (
-    create_password_hash,
-    verify_password,
+    create_password_hash_async,
+    verify_password_async,
     verify_token,
+    create_access_token,
+    create_refresh_token,
     create_refresh_and_access_tokens
 )
 from src.auth.schemas import (
@@ -17,6 +18,7 @@ from src.auth.schemas import (
     RefreshTokenSave,
 )
 from src.auth.dao import TokenDAO
+from src.auth.token_cache import access_token_cache
 
 
 class AuthService:
@@ -28,35 +30,31 @@ class AuthService:
         """Регистрация пользователя"""
         user_dict = user.model_dump()
         user_dict["is_active"] = True
-        user_dict["password"] = create_password_hash(password=user.password)
-        new_user: User = await self._user_dao.add_one_record(
-            values=UserSave(**user_dict)
-        )
+        user_dict["password"] = await create_password_hash_async(password=user.password)
+        user_id = await self._user_dao.reserve_id()
 
         tokens_dict = create_refresh_and_access_tokens(
-            user_id=new_user.id, username=new_user.username
+            user_id=user_id, username=user.username
         )
 
-        await self._token_dao.add_one_record(
-            values=RefreshTokenSave(
-                refresh_token=tokens_dict["refresh_token"],
-                user_id=new_user.id
-            )
+        await self._token_dao.add_user_with_token(
+            user_id=user_id,
+            user=UserSave(**user_dict),
+            refresh_token=tokens_dict["refresh_token"],
         )
         return tokens_dict
 
     async def login_user(self, user: UserLogin) -> dict[str, str]:
         """Вход пользователя в систему"""
         user_from_db = await self._user_dao.find_one_or_none(filters={"email": user.email})
-        if not user_from_db or not verify_password(user.password, user_from_db.password) or not user_from_db.is_active:
+        if not user_from_db or not await verify_password_async(user.password, user_from_db.password) or not user_from_db.is_active:
             raise InvalidCredentialsError(msg="Неверный email или пароль")
 
         tokens_dict = create_refresh_and_access_tokens(
             user_id=user_from_db.id, username=user_from_db.username
         )
 
-        await self._token_dao.delete_records(filters={"user_id": user_from_db.id})
-        await self._token_dao.add_one_record(
+        await self._token_dao.upsert_token(
             values=RefreshTokenSave(
                 refresh_token=tokens_dict["refresh_token"],
                 user_id=user_from_db.id
@@ -71,26 +69,22 @@ class AuthService:
         if user_info.get("token_type") != "refresh":
             raise InvalidTokenTypeError("Неверный тип токена")
         
-        user_from_db = await self._user_dao.find_one_or_none_by_id(data_id=int(user_info["sub"]))
-        if  not user_from_db:
+        user_id = int(user_info["sub"])
+        refresh_token = create_refresh_token(user_id=user_id)
+        username, is_active, is_rotated = await self._token_dao.rotate_refresh_token(
+            user_id=user_id, refresh_token=refresh_token
+        )
+        if username is None:
             raise UserNotFoundError(msg="Такого пользователя не существует")
-        if not user_from_db.is_active:
+        if not is_active:
             raise UserInactiveError(msg=f"User is inactive")
-
-        new_tokens_dict = create_refresh_and_access_tokens(
-            user_id=user_from_db.id, username=user_from_db.username
-        )
-
-        token_from_db = await self._token_dao.update_record(
-            values=RefreshTokenSave(
-                refresh_token=new_tokens_dict["refresh_token"],
-                user_id=user_from_db.id
-            ),
-            filters={"user_id": user_from_db.id}
-        )
-        if not token_from_db:
+        if not is_rotated:
             raise TokenRefreshError(msg="Обновление токенов невозможно")
-        return new_tokens_dict
+
+        return {
+            "access_token": create_access_token(user_id=user_id, username=username),
+            "refresh_token": refresh_token,
+        }
     
     async def logout_user_from_this_device(self, user_id: int) -> None:
         """Выход пользователя с этого устройства"""
@@ -98,7 +92,11 @@ class AuthService:
 
     @staticmethod
     def verify_access_token(token: str) -> dict:
+        payload = access_token_cache.get(token)
+        if payload is not None:
+            return payload
         payload = verify_token(token)
         if payload.get("token_type") != "access":
             raise InvalidTokenTypeError(msg="Неверный тип токена")
+        access_token_cache.set(token, payload)
         return payload
\ No newline at end of file
@@ -0,0 +1,73 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from src.config import settings
+from src.metrics.registry import registry, GaugeCollector
+
+
+class AccessTokenCache:
+    """LRU-кеш проверенных access-токенов.
+    Ключ - sha256 токена, запись удаляется по истечении exp"""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(payload)
+
+    def set(self, token: str, payload: dict) -> None:
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = dict(payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+access_token_cache = AccessTokenCache(max_size=settings.ACCESS_TOKEN_CACHE_SIZE)
+
+registry.register(GaugeCollector(
+    "access_token_cache_requests_total",
+    "Обращения к кешу access-токенов",
+    ("result",),
+    lambda: {("hit",): access_token_cache.hits, ("miss",): access_token_cache.misses},
+    metric_type="counter",
+))
+registry.register(GaugeCollector(
+    "access_token_cache_size",
+    "Записей в кеше access-токенов",
+    (),
+    lambda: {(): access_token_cache.stats()["size"]},
+))
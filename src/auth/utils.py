@@ -1,15 +1,20 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from src.config import settings
-from src.errors.service_exeptions import InvalidTokenTypeError
+from src.errors.service_exeptions import InvalidTokenTypeError, PasswordHashingBusyError
 
 
 auth_data = settings.auth_data
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_password_executor: ProcessPoolExecutor | None = None
+_password_slots: asyncio.Semaphore | None = None
+
 # password
 def create_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -18,6 +23,34 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_in_password_pool(func, *args):
+    """Выполняет bcrypt в пуле процессов, не блокируя event loop.
+    Если заняты все воркеры и очередь, сразу отказывает"""
+    global _password_executor, _password_slots
+    if _password_executor is None:
+        _password_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        _password_slots = asyncio.Semaphore(
+            settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_LIMIT
+        )
+    if _password_slots.locked():
+        raise PasswordHashingBusyError(msg="Сервер перегружен, повторите попытку позже")
+    async with _password_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, func, *args)
+
+async def create_password_hash_async(password: str) -> str:
+    return await _run_in_password_pool(create_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+def shutdown_password_executor() -> None:
+    global _password_executor, _password_slots
+    if _password_executor is not None:
+        _password_executor.shutdown(cancel_futures=True)
+        _password_executor, _password_slots = None, None
+
+
 #access_token
 
 def create_access_token(user_id: int, username: str, exp: timedelta | None = None) -> str:
@@ -36,7 +69,7 @@ def create_access_token(user_id: int, username: str, exp: timedelta | None = Non
 
 def create_refresh_token(user_id: int, exp: timedelta | None = None) -> str:
     if exp is None:
-        exp = timedelta(days=7)
+        exp = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     payload = {
         "sub": str(user_id),
         "exp": int((datetime.now(timezone.utc) + exp).timestamp()),
@@ -0,0 +1,87 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+try:
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # redis нужен только для CACHE_BACKEND=redis
+    aioredis = None
+    RedisError = OSError
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Кеш в памяти процесса с TTL и вытеснением по LRU"""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Кеш в Redis-совместимом сервере. LRU обеспечивается политикой
+    maxmemory-policy сервера, ошибки соединения не роняют запрос"""
+
+    def __init__(self, client):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        if aioredis is None:
+            raise RuntimeError("Для CACHE_BACKEND=redis нужен пакет redis")
+        return cls(aioredis.from_url(url))
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self._client.get(key)
+        except (RedisError, OSError):
+            logger.warning("Cache get failed for %s", key, exc_info=True)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        try:
+            await self._client.set(key, value, ex=ttl)
+        except (RedisError, OSError):
+            logger.warning("Cache set failed for %s", key, exc_info=True)
+
+    async def delete(self, *keys: str) -> None:
+        try:
+            await self._client.delete(*keys)
+        except (RedisError, OSError):
+            logger.warning("Cache delete failed for %s", keys, exc_info=True)
@@ -0,0 +1,80 @@
+import asyncio
+from typing import TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.backend import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from src.config import settings
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def user_posts_key(user_id: int) -> str:
+    # первая страница постов пользователя, остальные страницы не кешируются
+    return f"user_posts:{user_id}:first_page"
+
+
+def post_key(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+class EntityCache:
+    """Read-through кеш ответов сервисов поверх CacheBackend"""
+
+    def __init__(self, backend: CacheBackend, ttl: int, repeat_invalidation_after: float = 0.0):
+        self._backend = backend
+        self._ttl = ttl
+        self._repeat_invalidation_after = repeat_invalidation_after
+        self._invalidations: set[asyncio.Task] = set()
+
+    async def get(self, key: str, schema: type[SchemaT]) -> SchemaT | None:
+        raw = await self._backend.get(key)
+        if raw is None:
+            return None
+        return schema.model_validate_json(raw)
+
+    async def set(self, key: str, value: BaseModel) -> None:
+        await self._backend.set(key, value.model_dump_json().encode(), self._ttl)
+
+    async def invalidate(self, *keys: str) -> None:
+        if keys:
+            await self._backend.delete(*keys)
+
+    def invalidate_after_commit(self, session: AsyncSession, *keys: str) -> None:
+        """Удаляет ключи после commit сессии. До commit конкурентный GET прочитал бы старую строку
+        и вернул ее в кеш на весь TTL. Повторное удаление через repeat_invalidation_after секунд
+        убирает значение, прочитанное с отстающей реплики"""
+        event.listen(session.sync_session, "after_commit", lambda _: self._schedule_invalidation(keys), once=True)
+
+    def _schedule_invalidation(self, keys: tuple[str, ...]) -> None:
+        self._spawn_invalidation(keys)
+        if self._repeat_invalidation_after > 0:
+            asyncio.get_running_loop().call_later(self._repeat_invalidation_after, self._spawn_invalidation, keys)
+
+    def _spawn_invalidation(self, keys: tuple[str, ...]) -> None:
+        task = asyncio.create_task(self.invalidate(*keys))
+        self._invalidations.add(task)
+        task.add_done_callback(self._invalidations.discard)
+
+
+def build_entity_cache() -> EntityCache | None:
+    if settings.CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    elif settings.CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend.from_url(settings.CACHE_URL)
+    else:
+        return None
+    return EntityCache(
+        backend=backend,
+        ttl=settings.CACHE_TTL,
+        repeat_invalidation_after=settings.CACHE_REPEAT_INVALIDATION_DELAY if settings.DB_REPLICA_URLS else 0.0,
+    )
+
+
+entity_cache = build_entity_cache()
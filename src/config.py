@@ -1,4 +1,6 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,9 +11,63 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASSWORD: str
 
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = "round_robin"
+    DB_REPLICA_HEALTH_INTERVAL: float = 5.0
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Соединения, которые lifespan открывает и прогревает до готовности, не больше DB_POOL_SIZE
+    DB_WARMUP_CONNECTIONS: int = 5
+    DB_WARMUP_TIMEOUT: float = 10.0
+    DB_WARMUP_RETRY_INTERVAL: float = 5.0
+
     SECRET_KEY: str
     ALGORITHM: str
 
+    EXPORT_FETCH_SIZE: int = 1000
+    BULK_UPDATE_BATCH_SIZE: int = 1000
+    BATCH_INSERT_CHUNK_SIZE: int = 500
+    BATCH_COPY_THRESHOLD: int = 5000
+    BATCH_MAX_ITEMS: int = 10000
+    # Склейка одиночных POST /posts в один INSERT и commit: окно ожидания и размер пачки
+    POST_INSERT_COALESCING: bool = False
+    POST_INSERT_COALESCE_WINDOW_MS: float = 2.0
+    POST_INSERT_COALESCE_MAX_BATCH: int = 100
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+
+    # Допуск к эндпоинтам с bcrypt: in-flight запросов на процесс и token bucket на IP и аккаунт
+    AUTH_MAX_CONCURRENCY: int = 16
+    AUTH_IP_RATE: float = 1.0
+    AUTH_IP_BURST: int = 20
+    AUTH_ACCOUNT_RATE: float = 0.1
+    AUTH_ACCOUNT_BURST: int = 5
+    RATE_LIMIT_BACKEND: Literal["sqlite", "memory", "none"] = "sqlite"
+    RATE_LIMIT_SQLITE_PATH: str = "/tmp/fastblo_ratelimit.sqlite3"
+
+    ACCESS_TOKEN_CACHE_SIZE: int = 10000
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_REAPER_INTERVAL: float = 3600.0
+    TOKEN_REAPER_BATCH_SIZE: int = 1000
+
+    # memory - отдельный кеш в каждом процессе: инвалидация не доходит до других воркеров,
+    # поэтому подходит только для одного воркера, при нескольких нужен redis
+    CACHE_BACKEND: Literal["memory", "redis", "none"] = "none"
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_TTL: int = 60
+    CACHE_MAX_ENTRIES: int = 10000
+    # С репликами ключи удаляются повторно через столько секунд после commit, не меньше отставания реплик
+    CACHE_REPEAT_INVALIDATION_DELAY: float = 1.0
+
+    QUERY_BUDGET_WARNINGS: bool = True
+
+    JOB_WORKERS: int = 1
+    POST_PURGE_CHUNK_SIZE: int = 1000
+    # Аренда задачи удаления воркером, должна с запасом покрывать одну порцию
+    POST_PURGE_LEASE_SECONDS: float = 300.0
+
     model_config = SettingsConfigDict(
         env_file=Path(__file__).resolve().parent.parent / ".env"
     )
@@ -25,6 +81,13 @@ class Settings(BaseSettings):
     
     @property
     def auth_data(self) -> dict:
-        return {"secret_key": settings.SECRET_KEY, "algorithm": settings.ALGORITHM}
+        return {"secret_key": self.SECRET_KEY, "algorithm": self.ALGORITHM}
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
 
-settings = Settings()
\ No newline at end of file
+# Нужны при импорте для объявления роутов и лимитов, создание дешевое (~5 мс)
+settings = get_settings()
\ No newline at end of file
@@ -1,8 +1,86 @@
+from pydantic import BaseModel
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy import select, update, delete, exists, func, literal, true, cast, tuple_
+
 from src.db.base_dao import BaseDAO
-from src.db.models import Post
+from src.db.models import Post, SEARCH_CONFIG
+from src.errors.data_exeptions import TransactionError
 
 
 class PostDAO(BaseDAO):
     model = Post
 
-    
\ No newline at end of file
+    def _found(self, post_id: int):
+        # Внешний SELECT видит снимок до изменения в CTE, поэтому EXISTS отвечает, был ли пост вообще
+        return exists().where(self.model.id == post_id).label("found")
+
+
+    async def update_owned_post(self, post_id: int, user_id: int, values: BaseModel) -> tuple[bool, Post | None]:
+        """Обновляет пост владельца одним запросом.
+        Возвращает (пост существует, обновленный пост или None)"""
+        try:
+            upd = (
+                update(self.model)
+                .where(self.model.id == post_id, self.model.user_id == user_id)
+                .values(**values.model_dump(exclude_unset=True))
+                .returning(*self.model.__mapper__.columns)
+                .cte("upd")
+            )
+            one = select(literal(1)).subquery("one")
+            stmt = (
+                select(self._found(post_id), aliased(self.model, upd))
+                .select_from(one)
+                .outerjoin(upd, true())
+                .execution_options(populate_existing=True)
+            )
+            result = await self._session.execute(stmt)
+            found, record = result.one()
+            return found, record
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def delete_owned_post(self, post_id: int, user_id: int) -> tuple[bool, bool]:
+        """Удаляет пост владельца одним запросом.
+        Возвращает (пост существует, пост удален)"""
+        try:
+            deleted = (
+                delete(self.model)
+                .where(self.model.id == post_id, self.model.user_id == user_id)
+                .returning(self.model.id)
+                .cte("deleted")
+            )
+            stmt = select(self._found(post_id), select(func.count()).select_from(deleted).scalar_subquery())
+            result = await self._session.execute(stmt)
+            found, count = result.one()
+            return found, count > 0
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def search(self, query: str, limit: int, after: tuple[float, int] | None = None) -> list[Row]:
+        """Полнотекстовый поиск по GIN-индексу search_vector.
+        Возвращает строки (Post, rank, headline) по убыванию (rank, id)"""
+        try:
+            search_vector = self.model.__table__.c.search_vector
+            config = cast(literal(SEARCH_CONFIG), REGCONFIG)
+            tsquery = func.websearch_to_tsquery(config, query)
+            rank = func.ts_rank(search_vector, tsquery)
+            page = select(self.model.id, rank.label("rank")).where(search_vector.op("@@")(tsquery))
+            if after is not None:
+                page = page.where(tuple_(rank, self.model.id) < after)
+            page = page.order_by(rank.desc(), self.model.id.desc()).limit(limit).subquery("page")
+            # ts_headline дорогой, считаем его только для строк страницы
+            headline = func.ts_headline(config, self.model.text, tsquery, "MaxFragments=2, MaxWords=30, MinWords=10")
+            stmt = (
+                select(self.model, page.c.rank, headline.label("headline"))
+                .join(page, page.c.id == self.model.id)
+                .order_by(page.c.rank.desc(), page.c.id.desc())
+            )
+            result = await self._session.execute(stmt)
+            return result.all()
+        except SQLAlchemyError as e:
+            raise TransactionError()
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, update, delete, func, or_, and_
+
+from src.db.base_dao import BaseDAO
+from src.db.models import Post, PostPurge, PURGE_PENDING, PURGE_RUNNING
+from src.errors.data_exeptions import TransactionError
+
+
+class PostPurgeDAO(BaseDAO):
+    model = PostPurge
+
+    def _claimable(self):
+        """Ожидающее удаление или running, чей воркер не продлил аренду"""
+        return or_(
+            self.model.status == PURGE_PENDING,
+            and_(self.model.status == PURGE_RUNNING, self.model.lease_until < func.now()),
+        )
+
+    async def claim(self, user_id: int, lease: timedelta) -> bool:
+        """Забирает удаление в работу на lease. False, если удалять нечего или его держит другой воркер.
+        UPDATE блокирует строку, конкурентный claim после commit первого перепроверяет условие
+        и не находит строку, поэтому задачу получает ровно один воркер"""
+        try:
+            stmt = (
+                update(self.model)
+                .where(self.model.user_id == user_id, self._claimable())
+                .values(status=PURGE_RUNNING, error=None, lease_until=func.now() + lease)
+                .returning(self.model.id)
+            )
+            result = await self._session.execute(stmt)
+            return result.scalar_one_or_none() is not None
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def delete_posts_chunk(self, user_id: int, limit: int, lease: timedelta) -> list[int]:
+        """Удаляет до limit постов пользователя, прибавляет их число к прогрессу
+        и продлевает аренду на lease одним запросом. Возвращает id удаленных постов"""
+        try:
+            chunk = select(Post.id).where(Post.user_id == user_id).limit(limit)
+            deleted = delete(Post).where(Post.id.in_(chunk.scalar_subquery())).returning(Post.id).cte("deleted")
+            progress = (
+                update(self.model)
+                .where(self.model.user_id == user_id)
+                .values(
+                    deleted=self.model.deleted + select(func.count()).select_from(deleted).scalar_subquery(),
+                    lease_until=func.now() + lease,
+                )
+                .cte("progress")
+            )
+            stmt = select(deleted.c.id).add_cte(progress)
+            result = await self._session.execute(stmt)
+            return result.scalars().all()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def finish(self, user_id: int, status: str, error: str | None = None) -> None:
+        try:
+            stmt = (
+                update(self.model)
+                .where(self.model.user_id == user_id)
+                .values(status=status, error=error, lease_until=None)
+            )
+            await self._session.execute(stmt)
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def find_unfinished_user_ids(self) -> list[int]:
+        """Пользователи, чье удаление постов ждет воркера, в том числе прерванное перезапуском.
+        Удаления с действующей арендой уже выполняются другим воркером и не возвращаются"""
+        try:
+            stmt = (
+                select(self.model.user_id)
+                .where(self.model.status.in_([PURGE_PENDING, PURGE_RUNNING]), self._claimable())
+                .order_by(self.model.id)
+            )
+            result = await self._session.execute(stmt)
+            return result.scalars().all()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def get_progress(self, user_id: int) -> Row | None:
+        """Задача удаления и число оставшихся постов пользователя одним запросом"""
+        try:
+            remaining = select(func.count()).where(Post.user_id == user_id).scalar_subquery()
+            stmt = select(self.model, remaining.label("remaining")).where(self.model.user_id == user_id)
+            result = await self._session.execute(stmt)
+            return result.one_or_none()
+        except SQLAlchemyError as e:
+            raise TransactionError()
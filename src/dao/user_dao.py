@@ -1,35 +1,102 @@
+from datetime import datetime
+
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import selectinload
-from sqlalchemy import update, delete, select
+from sqlalchemy import update, select, func, tuple_, true, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
 
 from src.db.base_dao import BaseDAO
-from src.db.models import User, Post
+from src.db.models import User, Post, PostPurge, PURGE_PENDING, PURGE_RUNNING
 from src.errors.data_exeptions import UserNotFoundError, TransactionError
 
 
 class UserDAO(BaseDAO):
     model = User
 
-    async def deactive_user(self, user_id: int) -> tuple[int, int]:
+    async def reserve_id(self) -> int:
+        """Выделяет id из последовательности users, чтобы связанные записи вставить одним запросом"""
+        try:
+            stmt = select(func.nextval(func.pg_get_serial_sequence(self.model.__tablename__, "id")))
+            result = await self._session.execute(stmt)
+            return result.scalar_one()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def deactive_user(self, user_id: int) -> int:
+        """Делает пользователя неактивным и ставит удаление его постов в post_purges одним запросом.
+        Посты удаляются фоновой задачей, возвращает число деактивированных пользователей"""
         try:
-            stmt_1 = update(self.model).where(self.model.id == user_id).values(is_active = False)
-            result_user_deactive = await self._session.execute(stmt_1)
-            if not result_user_deactive.scalar_one_or_none():
+            deactivated = (
+                update(self.model)
+                .where(self.model.id == user_id)
+                .values(is_active=False)
+                .returning(self.model.id)
+                .cte("deactivated")
+            )
+            stmt = (
+                pg_insert(PostPurge)
+                .from_select(["user_id"], select(deactivated.c.id))
+                .on_conflict_do_update(
+                    index_elements=[PostPurge.user_id],
+                    # Выполняющееся удаление не сбрасываем: его воркер и так удалит все посты
+                    set_={
+                        "status": case(
+                            (PostPurge.status == PURGE_RUNNING, PURGE_RUNNING), else_=PURGE_PENDING
+                        ),
+                        "error": None,
+                        "updated_at": func.now(),
+                    },
+                )
+                .returning(PostPurge.user_id)
+            )
+            result = await self._session.execute(stmt)
+            deactivated_ids = result.scalars().all()
+            if not deactivated_ids:
                 raise UserNotFoundError(msg=f"{self.model.__name__} not found")
-            stmt_2 = delete(Post).where(Post.user_id == user_id)
-            result_post_delete = await self._session.execute(stmt_2)
-            await self._session.flush()
-            return result_user_deactive.rowcount, result_post_delete.rowcount
+            return len(deactivated_ids)
         except SQLAlchemyError as e:
             raise TransactionError()
 
 
-    async def get_user_with_posts(self, user_id: int) -> User:
+    async def get_user_with_posts(
+        self, user_id: int, limit: int, after: tuple[datetime, int] | None = None
+    ) -> tuple[User | None, list[Post]]:
+        """Возвращает пользователя и страницу его постов по ключу (created_at, id).
+        Посты неактивного пользователя не загружаются"""
+        user = await self.find_one_or_none_by_id(data_id=user_id)
+        if user is None or not user.is_active:
+            return user, []
         try:
-            stmt = select(self.model).options(selectinload(self.model.posts)).where(self.model.id == user_id)
+            stmt = select(Post).where(Post.user_id == user_id)
+            if after is not None:
+                stmt = stmt.where(tuple_(Post.created_at, Post.id) > after)
+            stmt = stmt.order_by(Post.created_at, Post.id).limit(limit)
             result = await self._session.execute(stmt)
-            record = result.scalar_one_or_none()
-            return record
+            return user, result.scalars().all()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def get_user_posts_versions(
+        self, user_id: int, limit: int, after: tuple[datetime, int] | None = None
+    ) -> tuple[datetime | None, list[Row]]:
+        """Версия страницы постов одним запросом: updated_at пользователя и
+        (id, created_at, updated_at) постов страницы, без тел постов"""
+        try:
+            page = select(Post.id, Post.created_at, Post.updated_at).where(Post.user_id == self.model.id)
+            if after is not None:
+                page = page.where(tuple_(Post.created_at, Post.id) > after)
+            page = page.order_by(Post.created_at, Post.id).limit(limit).lateral("page")
+            stmt = (
+                select(self.model.updated_at, page.c.id, page.c.created_at, page.c.updated_at.label("post_updated_at"))
+                .outerjoin(page, true())
+                .where(self.model.id == user_id)
+                .order_by(page.c.created_at, page.c.id)
+            )
+            rows = (await self._session.execute(stmt)).all()
+            if not rows:
+                return None, []
+            return rows[0].updated_at, [row for row in rows if row.id is not None]
         except SQLAlchemyError as e:
             raise TransactionError()
-        
\ No newline at end of file
@@ -1,16 +1,46 @@
 from datetime import datetime
 
 from sqlalchemy import func, Integer, TIMESTAMP
-from sqlalchemy.ext.asyncio import AsyncAttrs, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
 
-from src.config import settings
-
-DATABASE_URL = settings.db_url
-
-engine = create_async_engine(url=DATABASE_URL)
-
-async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+from src.config import get_settings
+from src.metrics.db import InstrumentedAsyncQueuePool, instrument_engine
+
+# Читающие сессии открывают транзакцию READ ONLY DEFERRABLE, соединение берется из пула при первом запросе
+READ_ONLY_OPTIONS = {"postgresql_readonly": True, "postgresql_deferrable": True}
+
+# Session makers создаются без engine, get_engine привязывает их при создании engine
+async_session_maker = async_sessionmaker(expire_on_commit=False, autoflush=False)
+read_session_maker = async_sessionmaker(expire_on_commit=False, autoflush=False)
+
+_engine: AsyncEngine | None = None
+
+
+def get_engine() -> AsyncEngine:
+    """Engine primary. Создается при первом вызове: в приложении из lifespan,
+    в скриптах и CLI - при первом обращении"""
+    global _engine
+    if _engine is None:
+        settings = get_settings()
+        _engine = create_async_engine(
+            url=settings.db_url,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+        )
+        instrument_engine(_engine, "primary")
+        async_session_maker.configure(bind=_engine)
+        read_session_maker.configure(bind=_engine.execution_options(**READ_ONLY_OPTIONS))
+    return _engine
+
+
+async def dispose_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -1,16 +1,31 @@
-from typing import Generic, TypeVar
+from datetime import datetime
+from typing import AsyncIterator, Callable, Generic, TypeVar
 
-from asyncpg.exceptions import UniqueViolationError
+from asyncpg.exceptions import PostgresError, UniqueViolationError
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, MultipleResultsFound
-from sqlalchemy import select, update, delete, insert, exists
+from sqlalchemy import select, update, delete, insert, exists, tuple_, values, column, table, bindparam
+from sqlalchemy.sql import Executable
 
 from src.db.base import Base
+from src.config import settings
 from src.errors.data_exeptions import Duplicate, TransactionError, IncorrectFilterAppliedError
 
 T = TypeVar("T", bound=Base)
 
+# Готовые statement'ы горячих запросов по (модель, запрос, набор фильтров).
+# Объект переиспользуется, поэтому ключ кэша компиляции SQLAlchemy считается один раз,
+# а одинаковый SQL попадает в кэш prepared statements asyncpg
+_statement_cache: dict[tuple, Executable] = {}
+
+
+def _is_unique_violation(e: IntegrityError) -> bool:
+    """asyncpg-ошибка лежит в e.orig либо в его __cause__ (адаптер SQLAlchemy)"""
+    return isinstance(e.orig, UniqueViolationError) or isinstance(
+        e.orig.__cause__, UniqueViolationError
+    )
+
 
 class BaseDAO(Generic[T]):
     model: type[T] = None
@@ -20,20 +35,50 @@ class BaseDAO(Generic[T]):
         if self.model is None:
             raise ValueError("Модель должна быть указана")
 
+    def _cached_statement(self, key: tuple, build: Callable[[], Executable]) -> Executable:
+        cache_key = (self.model, *key)
+        stmt = _statement_cache.get(cache_key)
+        if stmt is None:
+            stmt = _statement_cache[cache_key] = build()
+        return stmt
+
     async def find_one_or_none_by_id(self, data_id: int) -> T:
         try:
-            stmt = select(self.model).filter_by(id=data_id)
-            result = await self._session.execute(stmt)
+            stmt = self._cached_statement(
+                ("by_id",), lambda: select(self.model).filter_by(id=bindparam("data_id"))
+            )
+            result = await self._session.execute(stmt, {"data_id": data_id})
             record = result.scalar_one_or_none()
             return record
         except SQLAlchemyError as e:
             raise TransactionError()
 
 
+    async def find_updated_at_by_id(self, data_id: int) -> datetime | None:
+        """Версия записи для условных запросов: только updated_at, без загрузки строки"""
+        try:
+            stmt = self._cached_statement(
+                ("updated_at",), lambda: select(self.model.updated_at).where(self.model.id == bindparam("data_id"))
+            )
+            result = await self._session.execute(stmt, {"data_id": data_id})
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
     async def find_one_or_none(self, filters: dict = {}) -> T:
         try:
-            stmt = select(self.model).filter_by(**filters)
-            result = await self._session.execute(stmt)
+            # filter_by(x=None) дает IS NULL, такие фильтры не кэшируем
+            if any(value is None for value in filters.values()):
+                stmt, params = select(self.model).filter_by(**filters), None
+            else:
+                keys = tuple(sorted(filters))
+                stmt = self._cached_statement(
+                    ("find_one", keys),
+                    lambda: select(self.model).filter_by(**{key: bindparam(f"filter_{key}") for key in keys}),
+                )
+                params = {f"filter_{key}": value for key, value in filters.items()}
+            result = await self._session.execute(stmt, params)
             record = result.scalar_one_or_none()
             return record
         except SQLAlchemyError as e:
@@ -50,6 +95,38 @@ class BaseDAO(Generic[T]):
             raise TransactionError()
 
 
+    async def find_page_by_filters(
+        self, limit: int, after: tuple[datetime, int] | None = None, filters: dict = {}
+    ) -> list[T]:
+        try:
+            stmt = select(self.model).filter_by(**filters)
+            if after is not None:
+                stmt = stmt.where(tuple_(self.model.created_at, self.model.id) > after)
+            stmt = stmt.order_by(self.model.created_at, self.model.id).limit(limit)
+            result = await self._session.execute(stmt)
+            records = result.scalars().all()
+            return records
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def stream_all_by_filters(
+        self, fetch_size: int, filters: dict = {}
+    ) -> AsyncIterator[list[T]]:
+        try:
+            stmt = (
+                select(self.model)
+                .filter_by(**filters)
+                .order_by(self.model.id)
+                .execution_options(yield_per=fetch_size)
+            )
+            result = await self._session.stream_scalars(stmt)
+            async for partition in result.partitions():
+                yield partition
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
     async def add_one_record(self, values: BaseModel) -> T:
         values_dict = values.model_dump(exclude_unset=True)
         try:
@@ -58,28 +135,89 @@ class BaseDAO(Generic[T]):
             record = result.scalar_one_or_none()
             return record
         except IntegrityError as e:
-            if isinstance(e.orig, UniqueViolationError):
+            if _is_unique_violation(e):
                 raise Duplicate(msg=f"{self.model.__name__} already exists")
+            raise TransactionError()
         except SQLAlchemyError as e:
             raise TransactionError()
 
 
-    async def add_many_records(self, values_list: list[BaseModel]) -> list[T]:
+    async def add_many_records(self, values_list: list[BaseModel], batch_size: int | None = None) -> list[T]:
+        """Вставляет записи многострочными INSERT ... RETURNING пачками по batch_size"""
+        batch_size = batch_size or settings.BATCH_INSERT_CHUNK_SIZE
         values_dict_list = [
             values.model_dump(exclude_unset=True) for values in values_list
         ]
         try:
-            stmt = insert(self.model).values(values_dict_list)
-            result = await self._session.execute(stmt.returning(self.model))
-            records = result.scalars().all()
+            records = []
+            for start in range(0, len(values_dict_list), batch_size):
+                stmt = insert(self.model).values(values_dict_list[start:start + batch_size])
+                result = await self._session.execute(stmt.returning(self.model))
+                records.extend(result.scalars().all())
             return records
         except IntegrityError as e:
-            if isinstance(e.orig, UniqueViolationError):
+            if _is_unique_violation(e):
                 raise Duplicate(msg=f"{self.model.__name__} already exists")
+            raise TransactionError()
         except SQLAlchemyError as e:
             raise TransactionError()
 
 
+    async def add_records_in_order(self, values_list: list[BaseModel]) -> list[T]:
+        """Вставляет записи одним INSERT ... RETURNING, i-я возвращенная запись соответствует values_list[i].
+        Порядок RETURNING у многострочного INSERT не гарантирован, его восстанавливает
+        sort_by_parameter_order по автоинкрементному id"""
+        values_dict_list = [values.model_dump() for values in values_list]
+        try:
+            result = await self._session.execute(
+                insert(self.model).returning(self.model, sort_by_parameter_order=True), values_dict_list
+            )
+            return result.scalars().all()
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise Duplicate(msg=f"{self.model.__name__} already exists")
+            raise TransactionError()
+        except SQLAlchemyError as e:
+            raise TransactionError()
+
+
+    async def copy_many_records(self, values_list: list[BaseModel]) -> list[T]:
+        """Загружает записи через COPY во временную таблицу и переносит их
+        одним INSERT ... SELECT ... RETURNING"""
+        values_dict_list = [values.model_dump() for values in values_list]
+        columns = list(values_dict_list[0])
+        tmp_name = f"tmp_copy_{self.model.__tablename__}"
+        try:
+            connection = await self._session.connection()
+            # DDL идет через SQLAlchemy, чтобы оказаться внутри открытой ею транзакции
+            await connection.exec_driver_sql(
+                f"CREATE TEMP TABLE {tmp_name} ON COMMIT DROP AS "
+                f"SELECT {', '.join(columns)} FROM {self.model.__tablename__} WITH NO DATA"
+            )
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                tmp_name,
+                records=[tuple(row[key] for key in columns) for row in values_dict_list],
+                columns=columns,
+            )
+            tmp_table = table(tmp_name, *[column(key) for key in columns])
+            stmt = (
+                insert(self.model)
+                .from_select(columns, select(*tmp_table.c))
+                .returning(self.model)
+            )
+            result = await self._session.execute(stmt)
+            records = result.scalars().all()
+            await connection.exec_driver_sql(f"DROP TABLE {tmp_name}")
+            return records
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise Duplicate(msg=f"{self.model.__name__} already exists")
+            raise TransactionError()
+        except (SQLAlchemyError, PostgresError) as e:
+            raise TransactionError()
+
+
     async def update_record(self, values: BaseModel, filters: dict = {}) -> T:
         values_dict = values.model_dump(exclude_unset=True)
         try:
@@ -99,24 +237,42 @@ class BaseDAO(Generic[T]):
             raise TransactionError() 
 
 
-    async def bulk_update(self, records: list[BaseModel]) -> int:
+    async def bulk_update(self, records: list[BaseModel], batch_size: int | None = None) -> int:
+        """Обновляет записи по id одним UPDATE ... FROM (VALUES ...) на пачку.
+        Записи группируются по набору изменяемых полей"""
+        batch_size = batch_size or settings.BULK_UPDATE_BATCH_SIZE
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for record in records:
+            record_dict = record.model_dump(exclude_unset=True)
+            if "id" not in record_dict or len(record_dict) == 1:
+                continue
+            groups.setdefault(tuple(sorted(record_dict)), []).append(record_dict)
+        # Неизвестное поле иначе упало бы KeyError при сборке VALUES
+        if any(key not in self.model.__table__.c for keys in groups for key in keys):
+            raise TransactionError()
+
         try:
             updated_count = 0
-            for record in records:
-                record_dict = record.model_dump(exclude_unset=True)
-                if "id" not in record_dict:
-                    continue
-
-                update_data = {k: v for k, v in record_dict.items() if k != "id"}
-                stmt = (
-                    update(self.model)
-                    .where(self.model.id == record_dict["id"])
-                    .values(**update_data)
-                )
-                result = await self._session.execute(stmt)
-                updated_count += result.rowcount
-                await self._session.flush()
+            for keys, rows in groups.items():
+                columns = [column(key, self.model.__table__.c[key].type) for key in keys]
+                for start in range(0, len(rows), batch_size):
+                    data = values(*columns, name="data").data(
+                        [tuple(row[key] for key in keys) for row in rows[start:start + batch_size]]
+                    )
+                    stmt = (
+                        update(self.model)
+                        .where(self.model.id == data.c.id)
+                        .values({key: data.c[key] for key in keys if key != "id"})
+                        .execution_options(synchronize_session=False)
+                    )
+                    result = await self._session.execute(stmt)
+                    updated_count += result.rowcount
+            await self._session.flush()
             return updated_count
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise Duplicate(msg=f"{self.model.__name__} already exists")
+            raise TransactionError()
         except SQLAlchemyError as e:
             raise TransactionError() 
 
@@ -135,8 +291,10 @@ class BaseDAO(Generic[T]):
     
     async def check_existence(self, data_id: int) -> bool:
             try:
-                stmt = select(exists().where(self.model.id == data_id))
-                result = await self._session.execute(stmt)
+                stmt = self._cached_statement(
+                    ("exists",), lambda: select(exists().where(self.model.id == bindparam("data_id")))
+                )
+                result = await self._session.execute(stmt, {"data_id": data_id})
                 return result.scalar()
             except SQLAlchemyError as e:
                 raise TransactionError()
\ No newline at end of file
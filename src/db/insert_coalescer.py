@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import logging
+from typing import Generic
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import settings
+from src.dao.post_dao import PostDAO
+from src.db.base import async_session_maker
+from src.db.base_dao import BaseDAO, T
+from src.errors.data_exeptions import Duplicate, TransactionError
+from src.metrics.registry import Histogram, registry
+
+
+logger = logging.getLogger(__name__)
+
+COALESCED_BATCH_SIZE = registry.register(
+    Histogram(
+        "db_coalesced_insert_batch_size", "Строк в склеенном INSERT", ("table",),
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+    )
+)
+
+
+class InsertCoalescer(Generic[T]):
+    """Собирает одиночные вставки из параллельных запросов в одну транзакцию.
+    Пачка уходит через window секунд после первой записи или сразу при max_batch записях:
+    один многострочный INSERT ... RETURNING и один commit, каждый ожидающий получает свою строку.
+
+    Вставка фиксируется в собственной сессии, а не в сессии запроса"""
+
+    def __init__(
+        self,
+        dao: type[BaseDAO[T]],
+        window: float,
+        max_batch: int,
+        session_maker: async_sessionmaker = async_session_maker,
+    ):
+        self._dao = dao
+        self._window = window
+        self._max_batch = max_batch
+        self._session_maker = session_maker
+        self._pending: list[tuple[BaseModel, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def add(self, values: BaseModel) -> T:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush_pending()
+        elif self._timer is None:
+            # Пустой контекст: запросы пачки не попадают в статистику БД запроса, открывшего ее
+            self._timer = asyncio.get_running_loop().call_later(
+                self._window, self._flush_pending, context=contextvars.Context()
+            )
+        return await future
+
+    async def drain(self) -> None:
+        """Отправляет накопленные записи и ждет завершения всех пачек, вызывается при остановке"""
+        if self._pending:
+            self._flush_pending()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch), context=contextvars.Context())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _insert(self, values_list: list[BaseModel]) -> list[T]:
+        async with self._session_maker() as session:
+            records = await self._dao(session).add_records_in_order(values_list=values_list)
+            await session.commit()
+        return records
+
+    async def _flush(self, batch: list[tuple[BaseModel, asyncio.Future]]) -> None:
+        COALESCED_BATCH_SIZE.observe(len(batch), self._dao.model.__tablename__)
+        try:
+            results = await self._insert([values for values, _ in batch])
+        except (Duplicate, TransactionError) as e:
+            if len(batch) > 1:
+                # Пачка откатилась целиком: повторяем по одной, чтобы ошибка досталась только своему запросу
+                logger.warning("Coalesced insert of %s rows failed, retrying one by one", len(batch))
+                for item in batch:
+                    await self._flush([item])
+                return
+            results = [e]
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            # Запрос мог быть отменен, пока пачка писалась
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def build_post_insert_coalescer() -> InsertCoalescer | None:
+    if not settings.POST_INSERT_COALESCING:
+        return None
+    return InsertCoalescer(
+        dao=PostDAO,
+        window=settings.POST_INSERT_COALESCE_WINDOW_MS / 1000,
+        max_batch=settings.POST_INSERT_COALESCE_MAX_BATCH,
+    )
+
+
+post_insert_coalescer = build_post_insert_coalescer()
@@ -1,15 +1,25 @@
+from datetime import datetime
+
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy import (
+    Column,
+    Computed,
     ForeignKey,
+    Index,
+    Integer,
     String,
     Boolean,
     Text,
+    TIMESTAMP,
     text,
 )
 
 from src.db.base import Base
 
 class User(Base):
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
+
     username: Mapped[str] = mapped_column(String(50), unique=True)
     email: Mapped[str] = mapped_column(String(70), unique=True)
     is_active: Mapped[bool] = mapped_column(Boolean, server_default=text("TRUE"))
@@ -24,11 +34,61 @@ class User(Base):
     )
 
 
+# Конфигурация полнотекстового поиска, должна совпадать в колонке и в запросах
+SEARCH_CONFIG = "russian"
+
+
 class Post(Base):
+    __table_args__ = (
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     title: Mapped[str]
     text: Mapped[str] = mapped_column(Text)
     author: Mapped[str] = mapped_column(String) 
+    # Колонка есть только в таблице: ORM ее не загружает и не возвращает из INSERT/UPDATE
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(text, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="posts", uselist=False)
 
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
+
+# Статусы фонового удаления постов деактивированного пользователя
+PURGE_PENDING = "pending"
+PURGE_RUNNING = "running"
+PURGE_DONE = "done"
+PURGE_FAILED = "failed"
+
+
+class PostPurge(Base):
+    """Задача удаления постов деактивированного пользователя, хранит прогресс между перезапусками"""
+    __tablename__ = "post_purges"
+    __table_args__ = (
+        Index("uq_post_purges_user_id", "user_id", unique=True),
+        # Незавершенные удаления перезапускаются при старте, завершенные копятся и не читаются
+        Index(
+            "ix_post_purges_unfinished",
+            "id",
+            postgresql_where=text(f"status IN ('{PURGE_PENDING}', '{PURGE_RUNNING}')"),
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    status: Mapped[str] = mapped_column(String(16), server_default=text(f"'{PURGE_PENDING}'"))
+    deleted: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    error: Mapped[str | None] = mapped_column(Text)
+    # До какого момента running-задачу держит воркер, продлевается каждой порцией.
+    # Задачу с истекшей арендой (воркер упал или перезапущен) может забрать другой воркер
+    lease_until: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
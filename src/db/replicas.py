@@ -0,0 +1,99 @@
+import asyncio
+import itertools
+import logging
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+
+from src.config import settings
+from src.db.base import READ_ONLY_OPTIONS, read_session_maker
+from src.metrics.db import InstrumentedAsyncQueuePool, instrument_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """Распределяет читающие сессии по репликам.
+    Недоступная реплика исключается до следующей успешной проверки,
+    без здоровых реплик сессии идут в primary"""
+
+    def __init__(self, urls: list[str], strategy: str):
+        self._urls = urls
+        self._strategy = strategy
+        self._engines: list[AsyncEngine] = []
+        self._session_makers: list[async_sessionmaker] = []
+        self._healthy: list[bool] = []
+        self._counter = itertools.count()
+
+    def start(self) -> None:
+        """Создает engine реплик. Вызывается из lifespan, как get_engine для primary,
+        до вызова сессии идут в primary"""
+        if self._engines:
+            return
+        self._engines = [
+            create_async_engine(
+                url=url,
+                pool_pre_ping=True,
+                poolclass=InstrumentedAsyncQueuePool,
+                connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+            )
+            for url in self._urls
+        ]
+        self._session_makers = [
+            async_sessionmaker(bind=engine.execution_options(**READ_ONLY_OPTIONS), expire_on_commit=False, autoflush=False)
+            for engine in self._engines
+        ]
+        self._healthy = [True] * len(self._engines)
+        for index, engine in enumerate(self._engines):
+            event.listen(engine.sync_engine, "handle_error", self._on_error(index))
+            instrument_engine(engine, f"replica_{index}")
+
+    def _on_error(self, index: int):
+        def handle_error(context) -> None:
+            if context.is_disconnect:
+                self._mark(index, healthy=False)
+        return handle_error
+
+    def _mark(self, index: int, healthy: bool) -> None:
+        if self._healthy[index] != healthy:
+            logger.warning("Replica %s is %s", index, "healthy" if healthy else "unhealthy")
+        self._healthy[index] = healthy
+
+    def session_maker(self) -> async_sessionmaker:
+        healthy = [index for index, ok in enumerate(self._healthy) if ok]
+        if not healthy:
+            return read_session_maker
+        if self._strategy == "least_busy":
+            index = min(healthy, key=lambda i: self._engines[i].pool.checkedout())
+        else:
+            index = healthy[next(self._counter) % len(healthy)]
+        return self._session_makers[index]
+
+    async def check_health(self) -> None:
+        for index, engine in enumerate(self._engines):
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                self._mark(index, healthy=True)
+            except (SQLAlchemyError, OSError):
+                self._mark(index, healthy=False)
+
+    async def run_health_checks(self, interval: float) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for engine in self._engines:
+            await engine.dispose()
+        self._engines, self._session_makers, self._healthy = [], [], []
+
+    def __bool__(self) -> bool:
+        return bool(self._urls)
+
+
+replica_router = ReplicaRouter(
+    urls=settings.DB_REPLICA_URLS, strategy=settings.DB_REPLICA_STRATEGY
+)
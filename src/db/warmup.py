@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.dao.post_dao import PostDAO
+from src.dao.user_dao import UserDAO
+from src.db.base import read_session_maker
+from src.errors.data_exeptions import TransactionError
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_connection() -> None:
+    """Держит соединение пула, пока выполняет на нем горячие запросы.
+    Так SQLAlchemy компилирует statements в свой кеш, а asyncpg готовит их на этом соединении"""
+    async with read_session_maker() as session:
+        await session.execute(text("SELECT 1"))
+        for dao in (UserDAO(session), PostDAO(session)):
+            await dao.find_one_or_none_by_id(data_id=0)
+            await dao.check_existence(data_id=0)
+            await dao.find_updated_at_by_id(data_id=0)
+        await UserDAO(session).find_one_or_none(filters={"email": ""})
+
+
+async def warm_up_pool(connections: int) -> None:
+    """Открывает connections соединений пула одновременно и прогревает каждое"""
+    started = time.perf_counter()
+    await asyncio.gather(*(_warm_connection() for _ in range(connections)))
+    logger.info("Warmed up %s pool connections in %.1f ms", connections, (time.perf_counter() - started) * 1000)
+
+
+async def warm_up_until_ready(connections: int, retry_interval: float, ready: asyncio.Event) -> None:
+    """Повторяет прогрев, пока он не пройдет, затем выставляет ready"""
+    while True:
+        try:
+            await warm_up_pool(connections)
+            ready.set()
+            return
+        except (TransactionError, SQLAlchemyError, OSError):
+            logger.exception("Pool warm-up failed, retrying in %s s", retry_interval)
+            await asyncio.sleep(retry_interval)
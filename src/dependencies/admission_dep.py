@@ -0,0 +1,29 @@
+from typing import Annotated, AsyncIterator
+
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from src.auth.schemas import UserRegister
+from src.ratelimit.admission import admission_controller
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def admit_login(
+    request: Request, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+) -> AsyncIterator[None]:
+    async with admission_controller.admit("login", client_ip(request), form_data.username.strip().lower()):
+        yield
+
+
+async def admit_register(request: Request, user: UserRegister) -> AsyncIterator[None]:
+    async with admission_controller.admit("register", client_ip(request), user.email.lower()):
+        yield
+
+
+async def admit_password_change(request: Request, user_id: int) -> AsyncIterator[None]:
+    # подключается после check_owner, чтобы чужие запросы не тратили лимит аккаунта
+    async with admission_controller.admit("password", client_ip(request), str(user_id)):
+        yield
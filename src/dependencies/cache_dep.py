@@ -0,0 +1,5 @@
+from src.cache.entity_cache import EntityCache, entity_cache
+
+
+def get_entity_cache() -> EntityCache | None:
+    return entity_cache
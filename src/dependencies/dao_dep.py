@@ -3,6 +3,8 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.base import async_session_maker
+from src.db.insert_coalescer import InsertCoalescer, post_insert_coalescer
+from src.db.replicas import replica_router
 
 
 async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
@@ -18,11 +20,15 @@ async def get_session_with_commit() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_session_without_commit() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+    async with replica_router.session_maker()() as session:
         try:
             yield session
         except Exception:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+def get_post_insert_coalescer() -> InsertCoalescer | None:
+    return post_insert_coalescer
@@ -1,30 +1,38 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.dependencies.dao_dep import get_session_with_commit, get_session_without_commit
+from src.dependencies.dao_dep import get_session_with_commit, get_session_without_commit, get_post_insert_coalescer
+from src.dependencies.cache_dep import get_entity_cache
+from src.cache.entity_cache import EntityCache
+from src.db.insert_coalescer import InsertCoalescer
 from src.service.post_service import PostService
 from src.service.user_service import UserService
 
 
 async def get_post_service_with_commmit(
     session: AsyncSession = Depends(get_session_with_commit),
+    cache: EntityCache | None = Depends(get_entity_cache),
+    coalescer: InsertCoalescer | None = Depends(get_post_insert_coalescer),
 ) -> PostService:
-    return PostService(session=session)
+    return PostService(session=session, cache=cache, coalescer=coalescer)
 
 
 async def get_post_service_without_commmit(
     session: AsyncSession = Depends(get_session_without_commit),
+    cache: EntityCache | None = Depends(get_entity_cache),
 ) -> PostService:
-    return PostService(session=session)
+    return PostService(session=session, cache=cache)
 
 
 async def get_user_service_with_commit(
     session: AsyncSession = Depends(get_session_with_commit),
+    cache: EntityCache | None = Depends(get_entity_cache),
 ) -> UserService:
-    return UserService(session=session)
+    return UserService(session=session, cache=cache)
 
 
 async def get_user_service_without_commit(
     session: AsyncSession = Depends(get_session_without_commit),
+    cache: EntityCache | None = Depends(get_entity_cache),
 ) -> UserService:
-    return UserService(session=session)
+    return UserService(session=session, cache=cache)
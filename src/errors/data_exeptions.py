@@ -11,6 +11,10 @@ class PostNotFoundError(NotFoundError):
     pass
 
 
+class PostPurgeNotFoundError(NotFoundError):
+    pass
+
+
 class Duplicate(Exception):
     def __init__(self, msg: str | None = None):
         self.msg = msg
@@ -1,3 +1,5 @@
+import math
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
@@ -8,6 +10,9 @@ from src.errors.service_exeptions import (
     UserDeletionIntegrityError,
     PermissionDenied,
     InvalidTokenTypeError,
+    InvalidCursorError,
+    PasswordHashingBusyError,
+    TooManyRequestsError,
 )
 
 
@@ -61,4 +66,27 @@ def register_exception_handler(app: FastAPI) -> None:
     async def incorrect_filters_error(request: Request, exc: IncorrectFilterAppliedError) -> JSONResponse:
         return JSONResponse(
             status_code=500, content={"message": exc.msg}
-        )
\ No newline at end of file
+        )
+
+
+    @app.exception_handler(InvalidCursorError)
+    async def invalid_cursor_error(request: Request, exc: InvalidCursorError) -> JSONResponse:
+        return JSONResponse(
+            status_code=400, content={"message": exc.msg}
+        )
+
+
+    @app.exception_handler(PasswordHashingBusyError)
+    async def password_hashing_busy_error(request: Request, exc: PasswordHashingBusyError) -> JSONResponse:
+        return JSONResponse(
+            status_code=503, content={"message": exc.msg}
+        )
+
+
+    @app.exception_handler(TooManyRequestsError)
+    async def too_many_requests_error(request: Request, exc: TooManyRequestsError) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            content={"message": exc.msg},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
@@ -34,6 +34,25 @@ class TokenRefreshError(Exception):
         self.msg = msg
 
 
+class InvalidCursorError(Exception):
+    """Некорректный курсор пагинации"""
+    def __init__(self, msg: str | None = None) -> None:
+        self.msg = msg
+
+
+class PasswordHashingBusyError(Exception):
+    """Очередь хеширования паролей переполнена"""
+    def __init__(self, msg: str | None = None) -> None:
+        self.msg = msg
+
+
+class TooManyRequestsError(Exception):
+    """Запрос отклонен контролем допуска"""
+    def __init__(self, msg: str | None = None, retry_after: float = 1.0) -> None:
+        self.msg = msg
+        self.retry_after = retry_after
+
+
 # class CastomValidationError(Exception):
 #     def __init__(self, msg: str | None = None) -> None:
 #         self.msg = msg
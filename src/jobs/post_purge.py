@@ -0,0 +1,67 @@
+import logging
+from datetime import timedelta
+
+from src.cache.entity_cache import entity_cache, post_key, user_posts_key
+from src.config import settings
+from src.dao.post_purge_dao import PostPurgeDAO
+from src.db.base import async_session_maker
+from src.db.models import PURGE_DONE, PURGE_FAILED
+from src.errors.data_exeptions import TransactionError
+from src.jobs.queue import JobQueue
+from src.metrics.registry import Counter, registry
+
+
+logger = logging.getLogger(__name__)
+
+PURGED_POSTS = registry.register(
+    Counter("post_purge_deleted_posts_total", "Посты, удаленные фоновым удалением у деактивированных пользователей")
+)
+
+
+async def purge_user_posts(user_id: int) -> None:
+    """Удаляет посты деактивированного пользователя порциями по POST_PURGE_CHUNK_SIZE.
+    Каждая порция - отдельная транзакция, прогресс пишется в post_purges вместе с ней,
+    поэтому прерванное удаление продолжается с оставшихся постов.
+    Задачу выполняет только воркер, забравший ее аренду в post_purges"""
+    lease = timedelta(seconds=settings.POST_PURGE_LEASE_SECONDS)
+    async with async_session_maker() as session:
+        started = await PostPurgeDAO(session).claim(user_id=user_id, lease=lease)
+        await session.commit()
+    if not started:
+        return
+
+    try:
+        while True:
+            async with async_session_maker() as session:
+                post_ids = await PostPurgeDAO(session).delete_posts_chunk(
+                    user_id=user_id, limit=settings.POST_PURGE_CHUNK_SIZE, lease=lease
+                )
+                await session.commit()
+            if not post_ids:
+                break
+            PURGED_POSTS.inc(amount=len(post_ids))
+            if entity_cache:
+                await entity_cache.invalidate(user_posts_key(user_id), *[post_key(post_id) for post_id in post_ids])
+    except Exception as e:
+        logger.exception("Purge of posts of user %s failed", user_id)
+        async with async_session_maker() as session:
+            await PostPurgeDAO(session).finish(user_id=user_id, status=PURGE_FAILED, error=repr(e))
+            await session.commit()
+        return
+
+    async with async_session_maker() as session:
+        await PostPurgeDAO(session).finish(user_id=user_id, status=PURGE_DONE)
+        await session.commit()
+
+
+async def resume_post_purges(queue: JobQueue) -> int:
+    """Ставит в очередь удаления, не завершенные до перезапуска. Возвращает их число"""
+    try:
+        async with async_session_maker() as session:
+            user_ids = await PostPurgeDAO(session).find_unfinished_user_ids()
+    except TransactionError:
+        logger.exception("Could not load unfinished post purges")
+        return 0
+    for user_id in user_ids:
+        queue.submit(purge_user_posts, user_id)
+    return len(user_ids)
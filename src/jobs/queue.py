@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.metrics.registry import Counter, GaugeCollector, registry
+
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[..., Awaitable[Any]]
+
+BACKGROUND_JOBS = registry.register(
+    Counter("background_jobs_total", "Выполненные фоновые задачи", ("job", "result"))
+)
+
+
+class JobQueue:
+    """Очередь фоновых задач процесса.
+    Задача - корутинная функция с аргументами, ее выполняют воркеры, запущенные из lifespan.
+    Очередь живет в памяти: задачи, которые должны пережить перезапуск, хранят состояние в БД"""
+
+    def __init__(self, workers: int):
+        self._workers = workers
+        self._queue: asyncio.Queue[tuple[Job, tuple]] | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def size(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._queue = None
+
+    async def join(self) -> None:
+        """Ждет, пока воркеры выполнят все поставленные задачи"""
+        if self._queue:
+            await self._queue.join()
+
+    def submit(self, job: Job, *args: Any) -> None:
+        if self._queue is None:
+            logger.warning("Job queue is not running, %s%r dropped", job.__name__, args)
+            return
+        self._queue.put_nowait((job, args))
+
+    def submit_after_commit(self, session: AsyncSession, job: Job, *args: Any) -> None:
+        """Ставит задачу после commit сессии: задача не увидит незафиксированных данных,
+        а при rollback не запустится вовсе"""
+        event.listen(session.sync_session, "after_commit", lambda _: self.submit(job, *args), once=True)
+
+    async def _work(self) -> None:
+        while True:
+            job, args = await self._queue.get()
+            try:
+                await job(*args)
+                BACKGROUND_JOBS.inc(job.__name__, "ok")
+            except Exception:
+                BACKGROUND_JOBS.inc(job.__name__, "error")
+                logger.exception("Background job %s%r failed", job.__name__, args)
+            finally:
+                self._queue.task_done()
+
+
+job_queue = JobQueue(workers=settings.JOB_WORKERS)
+
+registry.register(GaugeCollector(
+    "background_jobs_queued", "Фоновые задачи в очереди к воркерам", (), lambda: {(): job_queue.size}
+))
@@ -1,19 +1,87 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
+
 import uvicorn
 from fastapi import FastAPI
 
 from src.auth.router import router as auth_router
 from src.api.post_router import router as post_router
 from src.api.user_router import router as user_router
+from src.api.metrics_router import router as metrics_router
+from src.api.health_router import router as health_router
+from src.metrics.middleware import MetricsMiddleware
 from src.errors.exception_handler import register_exception_handler
+from src.auth.utils import shutdown_password_executor
+from src.auth.reaper import run_token_reaper
+from src.db.base import get_engine, dispose_engine
+from src.db.insert_coalescer import post_insert_coalescer
+from src.db.replicas import replica_router
+from src.db.warmup import warm_up_until_ready
+from src.jobs.queue import job_queue
+from src.jobs.post_purge import resume_post_purges
+from src.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+async def after_ready(ready: asyncio.Event, job: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    """Задача, которой нужна БД, стартует после прогрева пула. Ее ошибка не затрагивает другие задачи"""
+    await ready.wait()
+    try:
+        await job(*args)
+    except Exception:
+        logger.exception("Startup job %s failed", job.__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_engine()
+    replica_router.start()
+    app.state.ready = asyncio.Event()
+    warm_up = asyncio.create_task(warm_up_until_ready(
+        min(settings.DB_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE), settings.DB_WARMUP_RETRY_INTERVAL, app.state.ready
+    ))
+    job_queue.start()
+    background_tasks = [warm_up, asyncio.create_task(after_ready(app.state.ready, resume_post_purges, job_queue))]
+    if settings.TOKEN_REAPER_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(after_ready(
+            app.state.ready, run_token_reaper, settings.TOKEN_REAPER_INTERVAL, settings.TOKEN_REAPER_BATCH_SIZE
+        )))
+    if replica_router:
+        background_tasks.append(
+            asyncio.create_task(replica_router.run_health_checks(settings.DB_REPLICA_HEALTH_INTERVAL))
+        )
+    # Не дольше DB_WARMUP_TIMEOUT: дальше прогрев повторяется в фоне, а /health/ready отвечает 503
+    await asyncio.wait({warm_up}, timeout=settings.DB_WARMUP_TIMEOUT)
+    yield
+    if post_insert_coalescer:
+        await post_insert_coalescer.drain()
+    await job_queue.stop()
+    for task in background_tasks:
+        task.cancel()
+    # Упавшая задача не должна помешать закрыть пулы и executor
+    for result in await asyncio.gather(*background_tasks, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.error("Background task failed", exc_info=result)
+    await replica_router.dispose()
+    await dispose_engine()
+    shutdown_password_executor()
+
 
+app = FastAPI(title="FastBlo", lifespan=lifespan)
 
-app = FastAPI(title="FastBlo")
+app.add_middleware(MetricsMiddleware)
 
 register_exception_handler(app=app)
 
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(post_router)
+app.include_router(metrics_router)
+app.include_router(health_router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.metrics.registry import registry, Histogram, GaugeCollector
+
+
+@dataclass
+class RequestDBStats:
+    queries: int = 0
+    db_time: float = 0.0
+    budget: int | None = None
+    statements: list[str] | None = None
+    parent: "RequestDBStats | None" = field(default=None, repr=False)
+
+
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar("request_db_stats", default=None)
+
+
+def record_query(elapsed: float, statement: str) -> None:
+    """Учитывает запрос в текущем и во всех объемлющих счетчиках"""
+    stats = request_db_stats.get()
+    while stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if stats.statements is not None:
+            stats.statements.append(statement)
+        stats = stats.parent
+
+
+@contextmanager
+def count_queries(record_statements: bool = False) -> Iterator[RequestDBStats]:
+    """Считает SQL-запросы, выполненные внутри блока"""
+    stats = RequestDBStats(
+        statements=[] if record_statements else None, parent=request_db_stats.get()
+    )
+    token = request_db_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_db_stats.reset(token)
+
+_engines: dict[str, AsyncEngine] = {}
+
+DB_QUERY_DURATION = registry.register(
+    Histogram("db_query_duration_seconds", "Время выполнения SQL-запроса", labels=("engine",))
+)
+DB_POOL_CHECKOUT_WAIT = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Ожидание соединения из пула",
+        labels=("engine",),
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+    )
+)
+
+
+def _collect_pool(attr: str) -> dict[tuple[str, ...], float]:
+    values = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        values[(name,)] = {
+            "checked_out": checked_out,
+            "size": pool.size(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": checked_out / capacity if capacity else 0.0,
+        }[attr]
+    return values
+
+
+registry.register(GaugeCollector(
+    "db_pool_checked_out", "Выданные из пула соединения", ("engine",), lambda: _collect_pool("checked_out")
+))
+registry.register(GaugeCollector(
+    "db_pool_size", "Постоянный размер пула", ("engine",), lambda: _collect_pool("size")
+))
+registry.register(GaugeCollector(
+    "db_pool_overflow", "Соединения сверх pool_size", ("engine",), lambda: _collect_pool("overflow")
+))
+registry.register(GaugeCollector(
+    "db_pool_saturation", "Доля занятых соединений от pool_size + max_overflow", ("engine",),
+    lambda: _collect_pool("saturation"),
+))
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время ожидания соединения"""
+
+    _metrics_name = "unknown"
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        # engine.dispose() подменяет пул новым, имя для метрик переносим
+        pool = super().recreate()
+        pool._metrics_name = self._metrics_name
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(
+                time.perf_counter() - started, self._metrics_name
+            )
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Подключает счетчики запросов и метрики пула к движку"""
+    _engines[name] = engine
+    engine.pool._metrics_name = name
+
+    # Время старта хранится в контексте выполнения: он живет один запрос,
+    # поэтому упавший запрос не оставляет следов на соединении
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        DB_QUERY_DURATION.observe(elapsed, name)
+        record_query(elapsed, statement)
@@ -0,0 +1,77 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.metrics.db import RequestDBStats, request_db_stats
+from src.metrics.registry import registry, Counter, Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+HTTP_REQUEST_DURATION = registry.register(
+    Histogram("http_request_duration_seconds", "Время обработки запроса", labels=("method", "route"))
+)
+HTTP_REQUESTS = registry.register(
+    Counter("http_requests_total", "Количество запросов", labels=("method", "route", "status"))
+)
+HTTP_REQUEST_DB_QUERIES = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "SQL-запросов на HTTP-запрос",
+        labels=("method", "route"),
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+    )
+)
+HTTP_REQUEST_DB_DURATION = registry.register(
+    Histogram("http_request_db_duration_seconds", "Время в БД на HTTP-запрос", labels=("method", "route"))
+)
+QUERY_BUDGET_EXCEEDED = registry.register(
+    Counter("http_request_query_budget_exceeded_total", "Запросы сверх бюджета SQL", labels=("method", "route"))
+)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: латентность по шаблону маршрута и статистика БД на запрос"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # Родитель - внешний счетчик, например assert_max_queries в тестах
+        stats = RequestDBStats(parent=request_db_stats.get())
+        token = request_db_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_db_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route_path)
+            HTTP_REQUESTS.inc(method, route_path, str(status_code))
+            HTTP_REQUEST_DB_QUERIES.observe(stats.queries, method, route_path)
+            HTTP_REQUEST_DB_DURATION.observe(stats.db_time, method, route_path)
+            if stats.budget is not None and stats.queries > stats.budget:
+                QUERY_BUDGET_EXCEEDED.inc(method, route_path)
+                if settings.QUERY_BUDGET_WARNINGS:
+                    logger.warning(
+                        "%s %s executed %d SQL queries, budget is %d",
+                        method, route_path, stats.queries, stats.budget,
+                    )
@@ -0,0 +1,27 @@
+from fastapi import Depends
+
+from src.metrics.db import request_db_stats
+
+
+def query_budget(max_queries: int):
+    """Объявляет для маршрута допустимое число SQL-запросов.
+    Превышение логирует MetricsMiddleware:
+
+        @router.get("/{post_id}", dependencies=[query_budget(1)])
+    """
+    async def declare_budget() -> None:
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+
+    declare_budget.max_queries = max_queries
+    return Depends(declare_budget)
+
+
+def route_query_budget(route) -> int | None:
+    """Возвращает бюджет, объявленный у маршрута, если он есть"""
+    for dependency in getattr(route, "dependencies", []):
+        max_queries = getattr(dependency.dependency, "max_queries", None)
+        if max_queries is not None:
+            return max_queries
+    return None
@@ -0,0 +1,82 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from src.config import settings
+from src.errors.service_exeptions import TooManyRequestsError
+from src.metrics.registry import Counter, GaugeCollector, registry
+from src.ratelimit.backend import Bucket, MemoryRateLimitBackend, RateLimitBackend, SQLiteRateLimitBackend
+
+
+ADMISSION_REJECTED = registry.register(
+    Counter("auth_admission_rejected_total", "Auth-запросы, отклоненные до хеширования пароля", ("scope", "reason"))
+)
+
+
+class AdmissionController:
+    """Пропускает запросы к bcrypt-эндпоинтам до начала хеширования.
+    Сначала проверяется число запросов в работе у процесса, затем token bucket
+    клиентского IP и аккаунта: токен берется из обоих или ни из одного"""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend | None,
+        max_concurrency: int,
+        ip_rate: float,
+        ip_burst: int,
+        account_rate: float,
+        account_burst: int,
+    ):
+        self._backend = backend
+        self._max_concurrency = max_concurrency
+        self._ip = (ip_rate, ip_burst)
+        self._account = (account_rate, account_burst)
+        self.in_flight = 0
+
+    def _buckets(self, scope: str, ip: str, account: str | None) -> list[Bucket]:
+        buckets = [Bucket(f"{scope}:ip:{ip}", *self._ip)]
+        if account is not None:
+            buckets.append(Bucket(f"{scope}:account:{account}", *self._account))
+        return buckets
+
+    @asynccontextmanager
+    async def admit(self, scope: str, ip: str, account: str | None = None) -> AsyncIterator[None]:
+        if self.in_flight >= self._max_concurrency:
+            ADMISSION_REJECTED.inc(scope, "concurrency")
+            raise TooManyRequestsError(msg="Сервер перегружен, повторите попытку позже")
+        self.in_flight += 1
+        try:
+            if self._backend is not None:
+                retry_after = await self._backend.acquire(self._buckets(scope, ip, account))
+                if retry_after is not None:
+                    ADMISSION_REJECTED.inc(scope, "rate")
+                    raise TooManyRequestsError(msg="Слишком много попыток, повторите позже", retry_after=retry_after)
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+def build_admission_controller() -> AdmissionController:
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        idle_ttl = max(
+            settings.AUTH_IP_BURST / settings.AUTH_IP_RATE, settings.AUTH_ACCOUNT_BURST / settings.AUTH_ACCOUNT_RATE
+        )
+        backend = SQLiteRateLimitBackend(path=settings.RATE_LIMIT_SQLITE_PATH, idle_ttl=idle_ttl)
+    elif settings.RATE_LIMIT_BACKEND == "memory":
+        backend = MemoryRateLimitBackend()
+    else:
+        backend = None
+    return AdmissionController(
+        backend=backend,
+        max_concurrency=settings.AUTH_MAX_CONCURRENCY,
+        ip_rate=settings.AUTH_IP_RATE,
+        ip_burst=settings.AUTH_IP_BURST,
+        account_rate=settings.AUTH_ACCOUNT_RATE,
+        account_burst=settings.AUTH_ACCOUNT_BURST,
+    )
+
+
+admission_controller = build_admission_controller()
+
+registry.register(GaugeCollector(
+    "auth_admission_in_flight", "Допущенные auth-запросы в работе", (), lambda: {(): admission_controller.in_flight}
+))
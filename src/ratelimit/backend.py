@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """Token bucket: rate токенов в секунду, не больше burst"""
+    key: str
+    rate: float
+    burst: int
+
+
+def _refill(tokens: float, updated: float, now: float, bucket: Bucket) -> float:
+    return min(float(bucket.burst), tokens + max(now - updated, 0.0) * bucket.rate)
+
+
+def _take(state: dict[str, tuple[float, float]], buckets: list[Bucket], now: float) -> tuple[float | None, dict]:
+    """Берет по токену из всех buckets или ни из одного.
+    Возвращает (None или секунды до появления токена, новое состояние buckets)"""
+    refilled = {}
+    retry_after = 0.0
+    for bucket in buckets:
+        tokens, updated = state.get(bucket.key, (float(bucket.burst), now))
+        tokens = _refill(tokens, updated, now, bucket)
+        refilled[bucket.key] = tokens
+        if tokens < 1:
+            retry_after = max(retry_after, (1 - tokens) / bucket.rate)
+    if retry_after:
+        return retry_after, {key: (tokens, now) for key, tokens in refilled.items()}
+    return None, {key: (tokens - 1, now) for key, tokens in refilled.items()}
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, buckets: list[Bucket]) -> float | None:
+        """Атомарно берет по токену из каждого bucket.
+        None - запрос пропущен, иначе секунды, через которые стоит повторить"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Состояние в памяти процесса, у каждого воркера свои лимиты"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._state: dict[str, tuple[float, float]] = {}
+
+    async def acquire(self, buckets: list[Bucket]) -> float | None:
+        now = self._clock()
+        retry_after, state = _take(self._state, buckets, now)
+        self._state.update(state)
+        return retry_after
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Состояние в SQLite-файле, общем для воркеров на одной машине.
+    Bucket читается и обновляется в одной транзакции BEGIN IMMEDIATE, запросы к файлу
+    идут в потоке, чтобы ожидание блокировки не останавливало event loop"""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(
+        self, path: str, idle_ttl: float, clock: Callable[[], float] = time.time, busy_timeout: float = 1.0
+    ):
+        self._path = path
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+        self._busy_timeout = busy_timeout
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self._path, timeout=self._busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _acquire(self, buckets: list[Bucket]) -> float | None:
+        with self._lock:
+            conn = self._connect()
+            keys = [bucket.key for bucket in buckets]
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                rows = conn.execute(
+                    f"SELECT key, tokens, updated FROM buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+                ).fetchall()
+                retry_after, state = _take({key: (tokens, updated) for key, tokens, updated in rows}, buckets, now)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    [(key, tokens, updated) for key, (tokens, updated) in state.items()],
+                )
+                self._calls += 1
+                if self._calls % self.PRUNE_EVERY == 0:
+                    # За idle_ttl любой bucket снова наполняется, хранить его незачем
+                    conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self._idle_ttl,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return retry_after
+
+    async def acquire(self, buckets: list[Bucket]) -> float | None:
+        try:
+            return await asyncio.to_thread(self._acquire, buckets)
+        except sqlite3.Error:
+            logger.warning("Rate limit check failed for %s", [bucket.key for bucket in buckets], exc_info=True)
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+from src.errors.service_exeptions import InvalidCursorError
+
+ItemT = TypeVar("ItemT")
+
+
+class Page(BaseModel, Generic[ItemT]):
+    items: list[ItemT] = Field(default_factory=list)
+    next_cursor: str | None = Field(default=None)
+
+
+def encode_cursor(key, record_id: int, dump: Callable = datetime.isoformat) -> str:
+    """Кодирует ключ (key, id) в непрозрачный курсор, dump приводит key к JSON.
+    По умолчанию ключ - created_at, для поисковой выдачи - rank (dump=float)"""
+    raw = json.dumps([dump(key), record_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str, load: Callable = datetime.fromisoformat) -> tuple:
+    """Декодирует курсор обратно в ключ (key, id), load - обратное к dump преобразование"""
+    try:
+        key, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return load(key), int(record_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursorError(msg="Некорректный курсор")
+
+
+def next_cursor(records: list, limit: int) -> str | None:
+    """Возвращает курсор следующей страницы, если записей больше limit"""
+    if len(records) <= limit:
+        return None
+    last = records[limit - 1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -15,5 +17,19 @@ class PostSave(BasePost):
 
 class PostResponse(PostSave):
     id: int = Field(...)
-    
+    updated_at: datetime | None = Field(default=None)
+
+
+class PostSearchResult(PostResponse):
+    rank: float = Field(...)
+    headline: str = Field(...)
+
+
+class PostBatchError(BaseModel):
+    index: int = Field(...)
+    msg: str = Field(...)
+
 
+class PostBatchResponse(BaseModel):
+    posts: list[PostResponse] = Field(default_factory=list)
+    errors: list[PostBatchError] = Field(default_factory=list)
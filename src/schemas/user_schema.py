@@ -1,4 +1,5 @@
-from typing import Self
+from datetime import datetime
+from typing import Literal, Self
 import re
 
 from pydantic import BaseModel, Field, EmailStr, ConfigDict, field_validator, model_validator
@@ -16,11 +17,25 @@ class BaseUser(BaseModel):
 class UserResponse(BaseUser):
     id: int = Field(...)
     is_active: bool = Field(...)
+    updated_at: datetime | None = Field(default=None)
     # is_admin: bool = Field(...)
 
 
 class UserWithPosts(UserResponse):
     posts: list[PostResponse] = Field(default_factory=list)
+    next_cursor: str | None = Field(default=None)
+
+
+class PostPurgeResponse(BaseModel):
+    """Прогресс фонового удаления постов деактивированного пользователя"""
+    user_id: int = Field(...)
+    status: Literal["pending", "running", "done", "failed"] = Field(...)
+    deleted: int = Field(...)
+    remaining: int = Field(...)
+    error: str | None = Field(default=None)
+    updated_at: datetime = Field(...)
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChangeUsername(BaseModel):
@@ -1,14 +1,38 @@
+from datetime import datetime
+from typing import Any, AsyncIterator
+
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.schemas.post_schema import BasePost, PostResponse, PostSave
+from src.config import settings
+from src.schemas.post_schema import (
+    BasePost,
+    PostResponse,
+    PostSave,
+    PostSearchResult,
+    PostBatchError,
+    PostBatchResponse,
+)
+from src.schemas.pagination_schema import Page, decode_cursor, encode_cursor, next_cursor
 from src.dao.post_dao import PostDAO
+from src.cache.entity_cache import EntityCache, post_key, user_posts_key
+from src.db.insert_coalescer import InsertCoalescer
 from src.errors.data_exeptions import PostNotFoundError
 from src.errors.service_exeptions import PermissionDenied
 
 
 class PostService:
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self, session: AsyncSession, cache: EntityCache | None = None, coalescer: InsertCoalescer | None = None
+    ):
+        self._session = session
         self._post_dao = PostDAO(session)
+        self._cache = cache
+        self._coalescer = coalescer
+
+    def _invalidate(self, *keys: str) -> None:
+        if self._cache:
+            self._cache.invalidate_after_commit(self._session, *keys)
 
     async def create_post(
         self, user_id: int, author: str, post: BasePost
@@ -17,38 +41,115 @@ class PostService:
         post_dict["user_id"] = user_id
         post_dict["author"] = author
         new_post = PostSave(**post_dict)
-        post_from_db = await self._post_dao.add_one_record(values=new_post)
+        if self._coalescer:
+            # Пост фиксируется пачкой в сессии coalescer'а, а не в сессии запроса
+            post_from_db = await self._coalescer.add(new_post)
+        else:
+            post_from_db = await self._post_dao.add_one_record(values=new_post)
+        self._invalidate(user_posts_key(user_id))
         return PostResponse.model_validate(post_from_db)
 
 
-    async def get_all_posts(self) -> list[PostResponse]:
-        posts_from_db = await self._post_dao.find_all_by_filters()
+    async def create_posts(
+        self, user_id: int, author: str, posts: list[dict[str, Any]]
+    ) -> PostBatchResponse:
+        """Создает посты пачкой, невалидные элементы возвращаются в errors"""
+        posts_to_save, errors = [], []
+        for index, raw_post in enumerate(posts):
+            try:
+                post = BasePost.model_validate(raw_post)
+            except ValidationError as e:
+                msg = "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                )
+                errors.append(PostBatchError(index=index, msg=msg))
+                continue
+            posts_to_save.append(PostSave(**post.model_dump(), user_id=user_id, author=author))
+
+        if not posts_to_save:
+            return PostBatchResponse(errors=errors)
+        if len(posts_to_save) >= settings.BATCH_COPY_THRESHOLD:
+            posts_from_db = await self._post_dao.copy_many_records(values_list=posts_to_save)
+        else:
+            posts_from_db = await self._post_dao.add_many_records(values_list=posts_to_save)
+        self._invalidate(user_posts_key(user_id))
+        return PostBatchResponse(
+            posts=[PostResponse.model_validate(post) for post in posts_from_db],
+            errors=errors,
+        )
+
+
+    async def get_all_posts(self, limit: int = 20, after: str | None = None) -> Page[PostResponse]:
+        posts_from_db = await self._post_dao.find_page_by_filters(
+            limit=limit + 1, after=decode_cursor(after) if after else None
+        )
         if not posts_from_db:
             raise PostNotFoundError(msg="Посты не найдены")
-        return [PostResponse.model_validate(post) for post in posts_from_db]
+        return Page[PostResponse](
+            items=[PostResponse.model_validate(post) for post in posts_from_db[:limit]],
+            next_cursor=next_cursor(posts_from_db, limit),
+        )
+
+
+    async def search_posts(self, query: str, limit: int = 20, after: str | None = None) -> Page[PostSearchResult]:
+        """Возвращает страницу результатов полнотекстового поиска, лучшие совпадения первыми"""
+        rows = await self._post_dao.search(
+            query=query, limit=limit + 1, after=decode_cursor(after, load=float) if after else None
+        )
+        cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            cursor = encode_cursor(last.rank, last.Post.id, dump=float)
+        return Page[PostSearchResult](
+            items=[
+                PostSearchResult(**PostResponse.model_validate(post).model_dump(), rank=rank, headline=headline)
+                for post, rank, headline in rows[:limit]
+            ],
+            next_cursor=cursor,
+        )
+
+
+    async def export_posts(self, fetch_size: int) -> AsyncIterator[bytes]:
+        async for posts_from_db in self._post_dao.stream_all_by_filters(fetch_size=fetch_size):
+            yield b"".join(
+                PostResponse.model_validate(post).model_dump_json().encode() + b"\n"
+                for post in posts_from_db
+            )
 
 
     async def get_post(self, post_id: int) -> PostResponse:
+        if self._cache:
+            cached_post = await self._cache.get(post_key(post_id), PostResponse)
+            if cached_post:
+                return cached_post
         post_from_db = await self._post_dao.find_one_or_none_by_id(data_id=post_id)
         if not post_from_db:
             raise PostNotFoundError(msg="Пост не найдены")
-        return PostResponse.model_validate(post_from_db)
+        post = PostResponse.model_validate(post_from_db)
+        if self._cache:
+            await self._cache.set(post_key(post_id), post)
+        return post
+
+
+    async def get_post_updated_at(self, post_id: int) -> datetime | None:
+        """Версия поста для условного GET"""
+        return await self._post_dao.find_updated_at_by_id(data_id=post_id)
 
 
     async def update_post(self, user_id: int, post_id: int, post: BasePost) -> PostResponse:
-        post_exists = await self._post_dao.check_existence(data_id=post_id)
+        post_exists, post_from_db = await self._post_dao.update_owned_post(post_id=post_id, user_id=user_id, values=post)
         if not post_exists:
             raise PostNotFoundError(msg="Пост не найден")
-        post_from_db = await self._post_dao.update_record(values=post, filters={"id": post_id, "user_id": user_id})
         if not post_from_db:
             raise PermissionDenied(msg="Запрещенное действие")
+        self._invalidate(post_key(post_id), user_posts_key(user_id))
         return PostResponse.model_validate(post_from_db)
 
 
     async def delete_post(self, post_id: int, user_id: int) -> None:
-        post_exists = await self._post_dao.check_existence(data_id=post_id)
+        post_exists, post_deleted = await self._post_dao.delete_owned_post(post_id=post_id, user_id=user_id)
         if not post_exists:
             raise PostNotFoundError(msg="Пост не найден")
-        post_deleted = await self._post_dao.delete_records(filters={"id": post_id, "user_id": user_id})
-        if post_deleted < 1:
+        if not post_deleted:
             raise PermissionDenied(msg="Запрещенное действие")
+        self._invalidate(post_key(post_id), user_posts_key(user_id))
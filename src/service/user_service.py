@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.user_schema import (
@@ -6,46 +8,115 @@ from src.schemas.user_schema import (
     UserWithPosts,
     ChangeUsername,
     UserUpdate,
+    PostPurgeResponse,
 )
+from src.schemas.post_schema import PostResponse
+from src.schemas.pagination_schema import Page, decode_cursor, next_cursor
 from src.db.models import User
 from src.dao.user_dao import UserDAO
-from src.auth.utils import verify_password, create_password_hash
+from src.dao.post_purge_dao import PostPurgeDAO
+from src.jobs.queue import job_queue
+from src.jobs.post_purge import purge_user_posts
+from src.cache.entity_cache import EntityCache, user_key, user_posts_key
+from src.auth.utils import verify_password_async, create_password_hash_async
 from src.errors.service_exeptions import UserInactiveError, InvalidCredentialsError, UserDeletionIntegrityError
-from src.errors.data_exeptions import UserNotFoundError
+from src.errors.data_exeptions import UserNotFoundError, PostPurgeNotFoundError
+
+POSTS_PAGE_SIZE = 20
 
 
 class UserService:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: EntityCache | None = None):
+        self._session = session
         self._user_dao = UserDAO(session)
+        self._purge_dao = PostPurgeDAO(session)
+        self._cache = cache
+
+    def _invalidate(self, *keys: str) -> None:
+        if self._cache:
+            self._cache.invalidate_after_commit(self._session, *keys)
 
     async def get_user_by_id(self, user_id: int) -> UserResponse:
         """Возвращает пользователя по id"""
+        if self._cache:
+            cached_user = await self._cache.get(user_key(user_id), UserResponse)
+            if cached_user:
+                return cached_user
         user_from_db: User = await self._user_dao.find_one_or_none_by_id(
             data_id=user_id
         )
         if not user_from_db:
             raise UserNotFoundError(msg="Пользователь не найден")
         if user_from_db.is_active:
-            return UserResponse.model_validate(user_from_db)
+            user = UserResponse.model_validate(user_from_db)
+            if self._cache:
+                await self._cache.set(user_key(user_id), user)
+            return user
         raise UserInactiveError(msg=f"User is inactive")
 
-    async def get_user_with_posts(self, user_id: int) -> UserWithPosts:
-        """Возвращает посты пользователя"""
-        user_from_db = await self._user_dao.get_user_with_posts(user_id=user_id)
+    async def get_user_with_posts(
+        self, user_id: int, limit: int = POSTS_PAGE_SIZE, after: str | None = None
+    ) -> UserWithPosts:
+        """Возвращает пользователя со страницей его постов.
+        В кеше хранится только первая страница размера по умолчанию"""
+        cacheable = self._cache and after is None and limit == POSTS_PAGE_SIZE
+        if cacheable:
+            cached_user = await self._cache.get(user_posts_key(user_id), UserWithPosts)
+            if cached_user:
+                return cached_user
+        user_from_db, posts_from_db = await self._user_dao.get_user_with_posts(
+            user_id=user_id,
+            limit=limit + 1,
+            after=decode_cursor(after) if after else None,
+        )
         if not user_from_db:
             raise UserNotFoundError(msg="Пользователь не найден")
         if user_from_db.is_active:
-            return UserWithPosts.model_validate(user_from_db)
+            user = UserWithPosts(
+                **UserResponse.model_validate(user_from_db).model_dump(),
+                posts=[PostResponse.model_validate(post) for post in posts_from_db[:limit]],
+                next_cursor=next_cursor(posts_from_db, limit),
+            )
+            if cacheable:
+                await self._cache.set(user_posts_key(user_id), user)
+            return user
         raise UserInactiveError(msg=f"User is inactive")
 
-    async def get_all_users(self) -> list[UserResponse]:
-        """Возвращает всех пользователей"""
-        users_from_db = await self._user_dao.find_all_by_filters(
-            filters={"is_active": True}
+    async def get_user_updated_at(self, user_id: int) -> datetime | None:
+        """Версия пользователя для условного GET"""
+        return await self._user_dao.find_updated_at_by_id(data_id=user_id)
+
+    async def get_user_posts_version(
+        self, user_id: int, limit: int = POSTS_PAGE_SIZE, after: str | None = None
+    ) -> tuple[datetime, list[tuple[int, datetime]], str | None] | None:
+        """Версия страницы постов пользователя для условного GET:
+        (updated_at пользователя, (id, updated_at) постов, курсор следующей страницы)"""
+        user_updated_at, posts = await self._user_dao.get_user_posts_versions(
+            user_id=user_id,
+            limit=limit + 1,
+            after=decode_cursor(after) if after else None,
+        )
+        if user_updated_at is None:
+            return None
+        return (
+            user_updated_at,
+            [(post.id, post.post_updated_at) for post in posts[:limit]],
+            next_cursor(posts, limit),
+        )
+
+    async def get_all_users(self, limit: int = 20, after: str | None = None) -> Page[UserResponse]:
+        """Возвращает страницу активных пользователей"""
+        users_from_db = await self._user_dao.find_page_by_filters(
+            limit=limit + 1,
+            after=decode_cursor(after) if after else None,
+            filters={"is_active": True},
         )
         if not users_from_db:
             raise UserNotFoundError(msg="Пользователи не найден")
-        return [UserResponse.model_validate(user) for user in users_from_db if user.is_active]
+        return Page[UserResponse](
+            items=[UserResponse.model_validate(user) for user in users_from_db[:limit] if user.is_active],
+            next_cursor=next_cursor(users_from_db, limit),
+        )
 
     async def update_username(self, user_id: int, data: ChangeUsername) -> UserResponse:
         """Обновляет username пользователя"""
@@ -54,6 +125,7 @@ class UserService:
         )
         if not user_from_db:
             raise UserNotFoundError(msg="Пользователь не найден")
+        self._invalidate(user_key(user_id), user_posts_key(user_id))
         return UserResponse.model_validate(user_from_db)
 
     async def change_password(
@@ -63,23 +135,41 @@ class UserService:
         user_from_db = await self._user_dao.find_one_or_none_by_id(data_id=user_id)
         if (
             not user_from_db
-            or not verify_password(data.password, user_from_db.password)
+            or not await verify_password_async(data.password, user_from_db.password)
             or not user_from_db.is_active
         ):
             raise InvalidCredentialsError(msg="Неверный email или пароль")
 
         user_from_db = await self._user_dao.update_record(
             values=UserUpdate(
-                password=create_password_hash(password=data.new_password)
+                password=await create_password_hash_async(password=data.new_password)
             ),
             filters={"id": user_id},
         )
+        self._invalidate(user_key(user_id), user_posts_key(user_id))
         return UserResponse.model_validate(user_from_db)
 
     async def deactive_user(self, user_id: int) -> None:
-        """Делает пользователя неактивным"""
-        user_deactived, post_deleted = await self._user_dao.deactive_user(user_id=user_id)
+        """Делает пользователя неактивным, посты удаляются фоновой задачей после commit"""
+        user_deactived = await self._user_dao.deactive_user(user_id=user_id)
         if user_deactived > 1:
             raise UserDeletionIntegrityError(msg="Удалено много пользователей")
+        self._invalidate(user_key(user_id), user_posts_key(user_id))
+        job_queue.submit_after_commit(self._session, purge_user_posts, user_id)
         return None
 
+    async def get_post_purge(self, user_id: int) -> PostPurgeResponse:
+        """Прогресс удаления постов деактивированного пользователя"""
+        progress = await self._purge_dao.get_progress(user_id=user_id)
+        if progress is None:
+            raise PostPurgeNotFoundError(msg="Удаление постов не запускалось")
+        purge, remaining = progress
+        return PostPurgeResponse(
+            user_id=purge.user_id,
+            status=purge.status,
+            deleted=purge.deleted,
+            remaining=remaining,
+            error=purge.error,
+            updated_at=purge.updated_at,
+        )
+
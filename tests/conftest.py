@@ -0,0 +1,24 @@
+from contextlib import contextmanager
+
+import pytest
+
+from src.metrics.db import count_queries
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Проверяет, что блок выполнил не больше max_queries SQL-запросов:
+
+        with assert_max_queries(2):
+            await client.get("/users/1/posts")
+    """
+    @contextmanager
+    def check(max_queries: int):
+        with count_queries(record_statements=True) as stats:
+            yield stats
+        assert stats.queries <= max_queries, (
+            f"Выполнено {stats.queries} SQL-запросов при бюджете {max_queries}:\n"
+            + "\n".join(stats.statements)
+        )
+
+    return check
@@ -0,0 +1,100 @@
+import os
+import json
+
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from src.db.base import Base
+from src.db.models import User, Post, PostPurge  # noqa: F401
+from src.auth.models import Token  # noqa: F401
+
+
+TEST_DB_URL = os.getenv("TEST_DB_URL")
+
+SEED_USERS = int(os.getenv("QUERY_PLAN_SEED_USERS", 5000))
+SEED_POSTS_PER_USER = int(os.getenv("QUERY_PLAN_SEED_POSTS_PER_USER", 10))
+
+SEED_SQL = [
+    """
+    INSERT INTO users (username, email, password, is_active, created_at)
+    SELECT 'user_' || g, 'user_' || g || '@example.com', 'hash', g % 10 <> 0,
+           now() - g * interval '1 minute'
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO posts (user_id, title, text, author, created_at)
+    SELECT u.id, 'title ' || p, 'text ' || p, u.username, u.created_at + p * interval '1 second'
+    FROM users AS u, generate_series(1, :posts) AS p
+    """,
+    """
+    INSERT INTO tokens (refresh_token, user_id, expires_at)
+    SELECT 'token_' || id, id, now() + CASE WHEN id % 100 = 0 THEN interval '-1 day' ELSE interval '7 days' END FROM users
+    """,
+    """
+    INSERT INTO post_purges (user_id, status, deleted)
+    SELECT id, CASE WHEN id % 100 = 0 THEN 'pending' ELSE 'done' END, :posts
+    FROM users WHERE NOT is_active
+    """,
+]
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def seeded_engine():
+    engine = create_async_engine(TEST_DB_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for stmt in SEED_SQL:
+            await conn.execute(text(stmt), {"users": SEED_USERS, "posts": SEED_POSTS_PER_USER})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+    yield engine
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    """Собирает имена таблиц, которые читаются последовательным сканированием"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def explain(seeded_engine):
+    """Выполняет DAO-вызов в откатываемой транзакции и возвращает
+    последовательные сканирования из планов всех отправленных запросов"""
+    async def run(dao_cls, method: str, **kwargs) -> dict[str, list[str]]:
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        async with seeded_engine.connect() as conn:
+            trans = await conn.begin()
+            session = AsyncSession(bind=conn, expire_on_commit=False, autoflush=False)
+            event.listen(seeded_engine.sync_engine, "before_cursor_execute", capture)
+            try:
+                await getattr(dao_cls(session), method)(**kwargs)
+            finally:
+                event.remove(seeded_engine.sync_engine, "before_cursor_execute", capture)
+
+            plans = {}
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                plans[statement] = _seq_scans(plan[0]["Plan"])
+            await trans.rollback()
+        return plans
+
+    return run
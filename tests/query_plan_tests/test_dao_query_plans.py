@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.dao.user_dao import UserDAO
+from src.dao.post_dao import PostDAO
+from src.dao.post_purge_dao import PostPurgeDAO
+from src.auth.dao import TokenDAO
+from src.auth.schemas import RefreshTokenSave
+from src.schemas.post_schema import BasePost
+from src.schemas.user_schema import ChangeUsername
+from tests.query_plan_tests.conftest import TEST_DB_URL
+
+
+pytestmark = [
+    pytest.mark.skipif(TEST_DB_URL is None, reason="TEST_DB_URL is not set"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+AFTER = (datetime(2000, 1, 1, tzinfo=timezone.utc), 0)
+LEASE = timedelta(minutes=5)
+
+# find_all_by_filters без фильтров читает всю таблицу намеренно и здесь не проверяется
+DAO_CALLS = [
+    (UserDAO, "find_one_or_none_by_id", {"data_id": 42}),
+    (UserDAO, "find_one_or_none", {"filters": {"email": "user_42@example.com"}}),
+    (UserDAO, "check_existence", {"data_id": 42}),
+    (UserDAO, "find_page_by_filters", {"limit": 21, "filters": {"is_active": True}}),
+    (UserDAO, "find_page_by_filters", {"limit": 21, "after": AFTER, "filters": {"is_active": True}}),
+    (UserDAO, "update_record", {"values": ChangeUsername(username="renamed"), "filters": {"id": 42, "is_active": True}}),
+    (UserDAO, "get_user_with_posts", {"user_id": 42, "limit": 21}),
+    (UserDAO, "get_user_with_posts", {"user_id": 42, "limit": 21, "after": AFTER}),
+    (UserDAO, "deactive_user", {"user_id": 42}),
+    (UserDAO, "find_updated_at_by_id", {"data_id": 42}),
+    (UserDAO, "get_user_posts_versions", {"user_id": 42, "limit": 21}),
+    (UserDAO, "get_user_posts_versions", {"user_id": 42, "limit": 21, "after": AFTER}),
+    (PostDAO, "find_one_or_none_by_id", {"data_id": 42}),
+    (PostDAO, "check_existence", {"data_id": 42}),
+    (PostDAO, "find_updated_at_by_id", {"data_id": 42}),
+    (PostPurgeDAO, "claim", {"user_id": 42, "lease": LEASE}),
+    (PostPurgeDAO, "delete_posts_chunk", {"user_id": 42, "limit": 1000, "lease": LEASE}),
+    (PostPurgeDAO, "finish", {"user_id": 42, "status": "done"}),
+    (PostPurgeDAO, "find_unfinished_user_ids", {}),
+    (PostPurgeDAO, "get_progress", {"user_id": 42}),
+    (PostDAO, "find_page_by_filters", {"limit": 21}),
+    (PostDAO, "find_page_by_filters", {"limit": 21, "after": AFTER}),
+    (PostDAO, "update_record", {"values": BasePost(title="a", text="a"), "filters": {"id": 42, "user_id": 5}}),
+    (PostDAO, "delete_records", {"filters": {"id": 42, "user_id": 5}}),
+    (PostDAO, "delete_records", {"filters": {"user_id": 5}}),
+    (PostDAO, "update_owned_post", {"post_id": 42, "user_id": 5, "values": BasePost(title="a", text="a")}),
+    (PostDAO, "delete_owned_post", {"post_id": 42, "user_id": 5}),
+    (PostDAO, "search", {"query": "needle", "limit": 21}),
+    (PostDAO, "search", {"query": "needle -haystack", "limit": 21, "after": (0.5, 42)}),
+    (TokenDAO, "delete_records", {"filters": {"user_id": 42}}),
+    (
+        TokenDAO,
+        "update_record",
+        {"values": RefreshTokenSave(refresh_token="new_token", user_id=42), "filters": {"user_id": 42}},
+    ),
+    (TokenDAO, "upsert_token", {"values": RefreshTokenSave(refresh_token="new_token", user_id=42)}),
+    (TokenDAO, "rotate_refresh_token", {"user_id": 42, "refresh_token": "new_token"}),
+    (TokenDAO, "delete_expired", {"limit": 1000}),
+]
+
+
+@pytest.mark.parametrize(
+    "dao_cls, method, kwargs",
+    DAO_CALLS,
+    ids=[f"{dao.__name__}.{method}-{i}" for i, (dao, method, _) in enumerate(DAO_CALLS)],
+)
+async def test_no_seq_scan(explain, dao_cls, method, kwargs):
+    plans = await explain(dao_cls, method, **kwargs)
+
+    assert plans, "DAO не отправил ни одного запроса"
+    for statement, seq_scans in plans.items():
+        assert not seq_scans, f"Seq Scan по {seq_scans} в запросе:\n{statement}"
@@ -0,0 +1,43 @@
+import copy
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.metrics.db import _engines, count_queries, instrument_engine
+from tests.query_plan_tests.conftest import TEST_DB_URL
+
+
+pytestmark = [
+    pytest.mark.skipif(TEST_DB_URL is None, reason="TEST_DB_URL is not set"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def engine():
+    engine = create_async_engine(TEST_DB_URL, pool_size=1, max_overflow=0)
+    instrument_engine(engine, "test_instrumented")
+    yield engine
+    _engines.pop("test_instrumented", None)
+    await engine.dispose()
+
+
+async def test_failed_statement_leaves_no_state_on_connection(engine):
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        info = copy.deepcopy((await conn.get_raw_connection()).info)
+
+    # Единственное соединение пула переживает много упавших запросов
+    for _ in range(3):
+        async with engine.connect() as conn:
+            with pytest.raises(DBAPIError):
+                await conn.execute(text("SELECT 1 / 0"))
+
+    async with engine.connect() as conn:
+        with count_queries() as stats:
+            await conn.execute(text("SELECT 1"))
+        assert (await conn.get_raw_connection()).info == info
+    assert stats.queries == 1
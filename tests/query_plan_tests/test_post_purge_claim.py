@@ -0,0 +1,73 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dao.post_purge_dao import PostPurgeDAO
+from src.db.models import PostPurge, PURGE_PENDING, PURGE_RUNNING
+from tests.query_plan_tests.conftest import TEST_DB_URL
+
+
+pytestmark = [
+    pytest.mark.skipif(TEST_DB_URL is None, reason="TEST_DB_URL is not set"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+LEASE = timedelta(minutes=5)
+
+
+async def pending_user_id(engine) -> int:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(PostPurge.user_id).where(PostPurge.status == PURGE_PENDING).order_by(PostPurge.id).limit(1)
+        )
+        return result.scalar_one()
+
+
+async def claim(engine, user_id: int, lease: timedelta, started: asyncio.Event, commit: asyncio.Event) -> bool:
+    async with AsyncSession(engine) as session:
+        started.set()
+        claimed = await PostPurgeDAO(session).claim(user_id=user_id, lease=lease)
+        await commit.wait()
+        await session.commit()
+        return claimed
+
+
+async def test_concurrent_claims_only_one_wins(seeded_engine):
+    user_id = await pending_user_id(seeded_engine)
+    first_started, second_started, commit = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+    first = asyncio.create_task(claim(seeded_engine, user_id, LEASE, first_started, commit))
+    await first_started.wait()
+    await asyncio.sleep(0.1)
+    # второй claim ждет блокировку строки, пока первый не зафиксирован
+    second = asyncio.create_task(claim(seeded_engine, user_id, LEASE, second_started, commit))
+    await second_started.wait()
+    await asyncio.sleep(0.1)
+    assert not second.done()
+
+    commit.set()
+
+    assert await first is True
+    assert await second is False
+
+
+async def test_expired_lease_can_be_claimed_again(seeded_engine):
+    async with seeded_engine.begin() as conn:
+        user_id = await pending_user_id(seeded_engine)
+        await conn.execute(
+            update(PostPurge)
+            .where(PostPurge.user_id == user_id)
+            .values(status=PURGE_RUNNING, lease_until=text("now() - interval '1 second'"))
+        )
+
+    async with AsyncSession(seeded_engine) as session:
+        dao = PostPurgeDAO(session)
+
+        assert user_id in await dao.find_unfinished_user_ids()
+        assert await dao.claim(user_id=user_id, lease=LEASE) is True
+        assert await dao.claim(user_id=user_id, lease=LEASE) is False
+        assert user_id not in await dao.find_unfinished_user_ids()
+        await session.rollback()
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.api.post_router import router as post_router
+from src.api.user_router import router as user_router
+from src.auth.utils import create_access_token
+from src.db.base import READ_ONLY_OPTIONS, async_session_maker, read_session_maker
+from src.main import app
+from src.metrics.db import _engines, instrument_engine
+from src.metrics.query_budget import route_query_budget
+from tests.query_plan_tests.conftest import TEST_DB_URL
+
+
+pytestmark = [
+    pytest.mark.skipif(TEST_DB_URL is None, reason="TEST_DB_URL is not set"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+USER_ID = 42
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client(seeded_engine):
+    """Клиент приложения, сессии которого смотрят в засеянную базу через инструментированный движок"""
+    engine = create_async_engine(TEST_DB_URL)
+    instrument_engine(engine, "test")
+    async_session_maker.configure(bind=engine)
+    read_session_maker.configure(bind=engine.execution_options(**READ_ONLY_OPTIONS))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        yield client
+    async_session_maker.configure(bind=None)
+    read_session_maker.configure(bind=None)
+    _engines.pop("test", None)
+    await engine.dispose()
+
+
+def budget_of(method: str, path: str) -> int:
+    for route in (*post_router.routes, *user_router.routes):
+        if getattr(route, "path", None) == path and method in route.methods:
+            return route_query_budget(route)
+    raise LookupError(f"{method} {path} is not routed")
+
+
+@pytest.mark.parametrize("path, url", [
+    ("/posts", "/posts"),
+    ("/posts/search", "/posts/search?q=title"),
+    ("/posts/{post_id}", f"/posts/{USER_ID}"),
+    ("/users", "/users"),
+    ("/users/{user_id}", f"/users/{USER_ID}"),
+    ("/users/{user_id}/posts", f"/users/{USER_ID}/posts"),
+])
+async def test_route_stays_within_query_budget(client, assert_max_queries, path, url):
+    headers = {"Authorization": f"Bearer {create_access_token(user_id=USER_ID, username=f'user_{USER_ID}')}"}
+    with assert_max_queries(budget_of("GET", path)) as stats:
+        response = await client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    assert stats.queries > 0
+
+
+async def test_conditional_get_stays_within_query_budget(client, assert_max_queries):
+    etag = (await client.get(f"/posts/{USER_ID}")).headers["ETag"]
+    with assert_max_queries(budget_of("GET", "/posts/{post_id}")):
+        response = await client.get(f"/posts/{USER_ID}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.requests import Request
+
+from src.api.conditional import entity_version, make_etag, not_modified, page_version
+
+
+UPDATED_AT = datetime(2025, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "headers": [(key.replace("_", "-").lower().encode(), value.encode()) for key, value in headers.items()],
+    })
+
+
+def test_etag_depends_on_version_only():
+    same_instant = UPDATED_AT.astimezone(timezone(timedelta(hours=3)))
+
+    assert make_etag("post", 1, UPDATED_AT) == make_etag("post", 1, same_instant)
+    assert make_etag("post", 1, UPDATED_AT) != make_etag("post", 2, UPDATED_AT)
+    assert make_etag("post", 1, UPDATED_AT).startswith('W/"')
+    assert make_etag("post", 1, UPDATED_AT, weak=False).startswith('"')
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("*", 304),
+        ('W/"other", {etag}', 304),
+        ("{strong}", 304),
+        ('W/"other"', None),
+    ],
+)
+def test_if_none_match(header, expected):
+    version = entity_version("post", 1, UPDATED_AT)
+    header = header.format(etag=version.etag, strong=version.etag.removeprefix("W/"))
+
+    response = not_modified(make_request(if_none_match=header), version)
+
+    assert (response and response.status_code) == expected
+    if response:
+        assert response.headers["etag"] == version.etag
+        assert response.headers["last-modified"] == "Thu, 01 May 2025 12:30:15 GMT"
+
+
+@pytest.mark.parametrize(
+    "since, expected",
+    [
+        ("Thu, 01 May 2025 12:30:15 GMT", 304),
+        ("Thu, 01 May 2025 12:30:14 GMT", None),
+        ("not a date", None),
+    ],
+)
+def test_if_modified_since(since, expected):
+    version = entity_version("user", 1, UPDATED_AT)
+
+    response = not_modified(make_request(if_modified_since=since), version)
+
+    assert (response and response.status_code) == expected
+
+
+def test_if_none_match_takes_precedence():
+    version = entity_version("user", 1, UPDATED_AT)
+    request = make_request(if_none_match='W/"other"', if_modified_since="Thu, 01 May 2025 12:30:15 GMT")
+
+    assert not_modified(request, version) is None
+
+
+def test_page_version_has_no_last_modified():
+    version = page_version("user_posts", 1, UPDATED_AT, [(1, UPDATED_AT)], None)
+
+    assert version.last_modified is None
+    assert version.etag != page_version("user_posts", 1, UPDATED_AT, [], None).etag
+    assert page_version("user_posts", 1, None, [], None) is None
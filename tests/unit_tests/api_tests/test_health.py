@@ -0,0 +1,26 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.api.health_router import router
+
+
+async def get_ready(app: FastAPI) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        return await client.get("/health/ready")
+
+
+async def test_not_ready_until_warmed_up():
+    app = FastAPI()
+    app.include_router(router)
+
+    assert (await get_ready(app)).status_code == 503
+
+    app.state.ready = asyncio.Event()
+    assert (await get_ready(app)).status_code == 503
+
+    app.state.ready.set()
+    response = await get_ready(app)
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from src.api.responses import SchemaJSONResponse, type_adapter
+from src.schemas.pagination_schema import Page
+from src.schemas.post_schema import PostResponse
+
+
+PAGE = Page[PostResponse](
+    items=[
+        PostResponse(
+            id=1, title="title", text="text", user_id=1, author="author",
+            updated_at=datetime(2025, 5, 1, tzinfo=timezone.utc),
+        )
+    ],
+    next_cursor="cursor",
+)
+
+app = FastAPI()
+
+
+@app.get("/posts", response_model=Page[PostResponse])
+async def get_posts():
+    return SchemaJSONResponse(PAGE, Page[PostResponse], headers={"ETag": 'W/"1"'})
+
+
+def test_renders_schema_json():
+    response = SchemaJSONResponse(PAGE, Page[PostResponse], status_code=201)
+
+    assert response.body == PAGE.model_dump_json().encode()
+    assert response.status_code == 201
+    assert response.media_type == "application/json"
+    assert type_adapter(Page[PostResponse]) is type_adapter(Page[PostResponse])
+
+
+async def test_route_returns_prerendered_body():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        response = await client.get("/posts")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == 'W/"1"'
+    assert Page[PostResponse].model_validate_json(response.content) == PAGE
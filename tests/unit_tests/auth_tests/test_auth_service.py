@@ -0,0 +1,76 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.auth.service import AuthService
+from src.auth.schemas import UserLogin, UserRegister
+from src.auth.utils import create_refresh_token, verify_token
+from src.errors.data_exeptions import UserNotFoundError
+from src.errors.service_exeptions import TokenRefreshError, UserInactiveError
+from src.db.models import User
+
+
+@pytest.fixture
+def daos():
+    with patch("src.auth.service.UserDAO") as user_dao, patch("src.auth.service.TokenDAO") as token_dao:
+        user_dao.return_value = AsyncMock()
+        token_dao.return_value = AsyncMock()
+        yield user_dao.return_value, token_dao.return_value
+
+
+@patch("src.auth.service.create_password_hash_async", AsyncMock(return_value="hash"))
+@pytest.mark.asyncio
+async def test_register_inserts_user_and_token_together(daos):
+    user_dao, token_dao = daos
+    user_dao.reserve_id.return_value = 7
+
+    tokens = await AuthService(session=None).register_user(
+        UserRegister(username="grisha", email="g@g.io", password="1a$aaaaa", confirm_password="1a$aaaaa")
+    )
+
+    kwargs = token_dao.add_user_with_token.call_args.kwargs
+    assert kwargs["user_id"] == 7
+    assert kwargs["user"].password == "hash"
+    assert kwargs["refresh_token"] == tokens["refresh_token"]
+    assert verify_token(tokens["access_token"])["sub"] == "7"
+
+
+@patch("src.auth.service.verify_password_async", AsyncMock(return_value=True))
+@pytest.mark.asyncio
+async def test_login_upserts_token(daos):
+    user_dao, token_dao = daos
+    user_dao.find_one_or_none.return_value = User(id=3, username="grisha", password="hash", is_active=True)
+
+    tokens = await AuthService(session=None).login_user(UserLogin(email="g@g.io", password="1a$aaaaa"))
+
+    saved = token_dao.upsert_token.call_args.kwargs["values"]
+    assert (saved.user_id, saved.refresh_token) == (3, tokens["refresh_token"])
+    token_dao.delete_records.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_token_in_one_call(daos):
+    _, token_dao = daos
+    token_dao.rotate_refresh_token.return_value = ("grisha", True, True)
+
+    tokens = await AuthService(session=None).refresh_tokens(create_refresh_token(user_id=3))
+
+    token_dao.rotate_refresh_token.assert_called_once_with(user_id=3, refresh_token=tokens["refresh_token"])
+    assert verify_token(tokens["access_token"])["username"] == "grisha"
+
+
+@pytest.mark.parametrize(
+    "rotated, error",
+    [
+        ((None, None, False), UserNotFoundError),
+        (("grisha", False, False), UserInactiveError),
+        (("grisha", True, False), TokenRefreshError),
+    ],
+)
+@pytest.mark.asyncio
+async def test_refresh_errors(daos, rotated, error):
+    _, token_dao = daos
+    token_dao.rotate_refresh_token.return_value = rotated
+
+    with pytest.raises(error):
+        await AuthService(session=None).refresh_tokens(create_refresh_token(user_id=3))
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from src.auth import utils
+from src.errors.service_exeptions import PasswordHashingBusyError
+
+
+@pytest.fixture(scope="function")
+def password_pool():
+    yield
+    utils.shutdown_password_executor()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_pool(password_pool):
+    password_hash = await utils.create_password_hash_async("1a$aaaaa")
+
+    assert await utils.verify_password_async("1a$aaaaa", password_hash)
+    assert not await utils.verify_password_async("1a$bbbbb", password_hash)
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr(utils, "_password_executor", object())
+    monkeypatch.setattr(utils, "_password_slots", asyncio.Semaphore(0))
+
+    with pytest.raises(PasswordHashingBusyError):
+        await utils.create_password_hash_async("1a$aaaaa")
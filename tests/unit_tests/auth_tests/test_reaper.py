@@ -0,0 +1,45 @@
+import asyncio
+import itertools
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.auth.reaper import reap_expired_tokens, run_token_reaper
+
+
+@pytest.fixture
+def mock_dao():
+    with patch("src.auth.reaper.TokenDAO") as mock_token_dao, \
+            patch("src.auth.reaper.async_session_maker", MagicMock()):
+        mock_dao_impl = AsyncMock()
+        mock_token_dao.return_value = mock_dao_impl
+        yield mock_dao_impl
+
+
+@pytest.mark.asyncio
+async def test_reaps_until_short_batch(mock_dao):
+    mock_dao.delete_expired.side_effect = [100, 100, 3]
+
+    assert await reap_expired_tokens(batch_size=100) == 203
+    assert mock_dao.delete_expired.call_count == 3
+    mock_dao.delete_expired.assert_called_with(limit=100)
+
+
+@pytest.mark.asyncio
+async def test_reaps_at_most_max_batches(mock_dao):
+    mock_dao.delete_expired.return_value = 100
+
+    assert await reap_expired_tokens(batch_size=100, max_batches=2) == 200
+    assert mock_dao.delete_expired.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reaper_survives_unreachable_database(mock_dao):
+    mock_dao.delete_expired.side_effect = itertools.chain([OSError("connection refused")] * 2, itertools.repeat(0))
+
+    task = asyncio.create_task(run_token_reaper(interval=0, batch_size=100))
+    await asyncio.sleep(0.05)
+
+    assert not task.done()
+    assert mock_dao.delete_expired.await_count >= 3
+    task.cancel()
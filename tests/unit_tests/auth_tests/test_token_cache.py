@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from src.auth.token_cache import AccessTokenCache, access_token_cache
+from src.auth.service import AuthService
+from src.auth.utils import create_access_token, create_refresh_token, verify_token
+from src.errors.service_exeptions import InvalidTokenTypeError
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_cache():
+    access_token_cache.clear()
+    yield
+    access_token_cache.clear()
+
+
+def test_cache_hit_returns_copy():
+    cache = AccessTokenCache(max_size=2)
+    cache.set("token", {"sub": "1", "exp": time.time() + 60})
+
+    payload = cache.get("token")
+    payload["sub"] = 1
+
+    assert cache.get("token")["sub"] == "1"
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 0}
+
+
+def test_cache_evicts_expired_and_least_recent():
+    cache = AccessTokenCache(max_size=2)
+    cache.set("expired", {"sub": "1", "exp": time.time() - 1})
+    cache.set("a", {"sub": "2", "exp": time.time() + 60})
+    cache.set("b", {"sub": "3", "exp": time.time() + 60})
+
+    assert cache.get("expired") is None
+    assert cache.get("a") is not None
+
+    cache.set("c", {"sub": "4", "exp": time.time() + 60})
+
+    assert cache.get("b") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_verify_access_token_skips_decode_on_hit():
+    token = create_access_token(user_id=1, username="grisha")
+
+    with patch("src.auth.service.verify_token", side_effect=verify_token) as mock_verify:
+        first = AuthService.verify_access_token(token)
+        first["sub"] = int(first["sub"])
+        second = AuthService.verify_access_token(token)
+
+    mock_verify.assert_called_once_with(token)
+    assert second["sub"] == "1"
+
+
+def test_verify_access_token_does_not_cache_refresh_token():
+    token = create_refresh_token(user_id=1, exp=timedelta(minutes=1))
+
+    with pytest.raises(InvalidTokenTypeError):
+        AuthService.verify_access_token(token)
+
+    assert access_token_cache.stats()["size"] == 0
@@ -0,0 +1,131 @@
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.backend import MemoryCacheBackend, RedisCacheBackend
+from src.cache.entity_cache import EntityCache, post_key, user_posts_key
+from src.schemas.post_schema import BasePost, PostResponse
+from src.service.post_service import PostService
+from src.db.models import Post
+
+
+class FakeRedis:
+    """Заглушка Redis-совместимого клиента"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+post = PostResponse(id=1, title="a", text="a", user_id=1, author="grisha")
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_ttl_and_lru():
+    backend = MemoryCacheBackend(max_entries=2)
+    await backend.set("expired", b"1", ttl=0)
+    await backend.set("a", b"2", ttl=60)
+    await backend.set("b", b"3", ttl=60)
+
+    assert await backend.get("expired") is None
+    assert await backend.get("a") == b"2"
+
+    await backend.set("c", b"4", ttl=60)
+
+    assert await backend.get("b") is None
+    assert await backend.get("c") == b"4"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "backend", [MemoryCacheBackend(max_entries=10), RedisCacheBackend(FakeRedis())]
+)
+async def test_entity_cache_roundtrip(backend):
+    cache = EntityCache(backend=backend, ttl=60)
+    await cache.set(post_key(1), post)
+
+    assert await cache.get(post_key(1), PostResponse) == post
+
+    await cache.invalidate(post_key(1))
+
+    assert await cache.get(post_key(1), PostResponse) is None
+
+
+@pytest.fixture(scope="function")
+def mock_dao():
+    with patch("src.service.post_service.PostDAO") as mock_post_dao:
+        mock_dao_impl = AsyncMock()
+        mock_post_dao.return_value = mock_dao_impl
+        yield mock_dao_impl
+
+
+@pytest.mark.asyncio
+async def test_get_post_reads_through_cache(mock_dao):
+    mock_dao.find_one_or_none_by_id.return_value = Post(
+        id=1, title="a", text="a", user_id=1, author="grisha"
+    )
+    post_service = PostService(session=None, cache=EntityCache(RedisCacheBackend(FakeRedis()), ttl=60))
+
+    assert await post_service.get_post(1) == post
+    assert await post_service.get_post(1) == post
+
+    mock_dao.find_one_or_none_by_id.assert_called_once_with(data_id=1)
+
+
+@pytest.mark.asyncio
+async def test_update_post_invalidates_cache(mock_dao):
+    mock_dao.update_owned_post.return_value = (
+        True, Post(id=1, title="b", text="b", user_id=1, author="grisha")
+    )
+    cache = EntityCache(MemoryCacheBackend(max_entries=10), ttl=60)
+    await cache.set(post_key(1), post)
+    await cache.set(user_posts_key(1), post)
+    session = AsyncSession()
+    post_service = PostService(session=session, cache=cache)
+
+    await post_service.update_post(1, 1, BasePost(title="b", text="b"))
+    await asyncio.sleep(0)
+
+    # До commit GET еще видит старую строку, ключи на месте
+    assert await cache.get(post_key(1), PostResponse) == post
+
+    await session.commit()
+    await asyncio.sleep(0)
+
+    assert await cache.get(post_key(1), PostResponse) is None
+    assert await cache.get(user_posts_key(1), PostResponse) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_skipped_on_rollback_and_repeated_after_delay():
+    backend = MemoryCacheBackend(max_entries=10)
+    cache = EntityCache(backend, ttl=60, repeat_invalidation_after=0.01)
+
+    session = AsyncSession()
+    await cache.set(post_key(1), post)
+    cache.invalidate_after_commit(session, post_key(1))
+    await session.rollback()
+    await asyncio.sleep(0)
+
+    assert await cache.get(post_key(1), PostResponse) == post
+
+    session = AsyncSession()
+    cache.invalidate_after_commit(session, post_key(1))
+    await session.commit()
+    await asyncio.sleep(0)
+    # значение со старой реплики, записанное между commit и повторным удалением
+    await cache.set(post_key(1), post)
+    await asyncio.sleep(0.05)
+
+    assert await cache.get(post_key(1), PostResponse) is None
@@ -0,0 +1,92 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
+from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.sql import Values, visitors
+
+from src.dao.post_dao import PostDAO
+from src.errors.data_exeptions import Duplicate, TransactionError
+
+
+class PostUpdate(BaseModel):
+    id: int
+    title: str | None = None
+    text: str | None = None
+
+
+class UnknownFieldUpdate(BaseModel):
+    id: int
+    rating: int
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=lambda stmt: MagicMock(rowcount=len(rows(stmt))))
+    session.flush = AsyncMock()
+    return session
+
+
+def compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def rows(stmt) -> list[tuple]:
+    """Строки VALUES из параметров скомпилированного statement"""
+    data = next(
+        element.table for element in visitors.iterate(stmt) if isinstance(getattr(element, "table", None), Values)
+    )
+    params = list(stmt.compile(dialect=postgresql.dialect()).params.values())
+    width = len(data.columns)
+    return [tuple(params[start:start + width]) for start in range(0, len(params), width)]
+
+
+def sent(session) -> list:
+    return [call.args[0] for call in session.execute.await_args_list]
+
+
+async def test_groups_by_field_set_and_chunks(session):
+    records = [PostUpdate(id=i, title=f"t{i}") for i in range(1, 6)] + [PostUpdate(id=9, title="t", text="x")]
+
+    updated = await PostDAO(session).bulk_update(records, batch_size=2)
+
+    statements = sent(session)
+    assert [len(rows(stmt)) for stmt in statements] == [2, 2, 1, 1]
+    assert rows(statements[0]) == [(1, "t1"), (2, "t2")]
+    assert rows(statements[3]) == [(9, "x", "t")]
+    assert "SET title=data.title" in compiled(statements[0])
+    assert "AS data (id, title) WHERE posts.id = data.id" in compiled(statements[0])
+    assert "SET title=data.title, text=data.text" in compiled(statements[3])
+    assert updated == 6
+
+
+async def test_skips_records_without_changes(session):
+    updated = await PostDAO(session).bulk_update([PostUpdate(id=1), PostUpdate(id=2, title="t")])
+
+    assert [rows(stmt) for stmt in sent(session)] == [[(2, "t")]]
+    assert updated == 1
+
+
+async def test_unknown_field_raises_transaction_error(session):
+    with pytest.raises(TransactionError):
+        await PostDAO(session).bulk_update([UnknownFieldUpdate(id=1, rating=5)])
+
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (IntegrityError("UPDATE", {}, UniqueViolationError()), Duplicate),
+        (IntegrityError("UPDATE", {}, ForeignKeyViolationError()), TransactionError),
+        (OperationalError("UPDATE", {}, Exception()), TransactionError),
+    ],
+)
+async def test_maps_database_errors(session, error, expected):
+    session.execute = AsyncMock(side_effect=error)
+
+    with pytest.raises(expected):
+        await PostDAO(session).bulk_update([PostUpdate(id=1, title="t")])
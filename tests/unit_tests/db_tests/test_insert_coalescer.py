@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.db.insert_coalescer import InsertCoalescer
+from src.db.models import Post
+from src.errors.data_exeptions import TransactionError
+from src.schemas.post_schema import PostSave
+
+
+def post_save(i: int) -> PostSave:
+    return PostSave(title=f"post {i}", text="text", user_id=i, author="grisha")
+
+
+def saved(values_list: list[PostSave]) -> list[Post]:
+    return [Post(id=values.user_id * 10, **values.model_dump()) for values in values_list]
+
+
+@pytest.fixture
+def dao():
+    dao_impl = AsyncMock()
+    dao_impl.add_records_in_order.side_effect = lambda values_list: saved(values_list)
+    dao_class = MagicMock(return_value=dao_impl, model=Post)
+    return dao_impl, dao_class
+
+
+@pytest.fixture
+def session_maker():
+    session = AsyncMock()
+    maker = MagicMock()
+    maker.return_value.__aenter__.return_value = session
+    return maker, session
+
+
+async def test_concurrent_inserts_share_one_commit(dao, session_maker):
+    dao_impl, dao_class = dao
+    maker, session = session_maker
+    coalescer = InsertCoalescer(dao=dao_class, window=0.01, max_batch=100, session_maker=maker)
+
+    posts = await asyncio.gather(*(coalescer.add(post_save(i)) for i in range(1, 4)))
+
+    assert [post.id for post in posts] == [10, 20, 30]
+    dao_impl.add_records_in_order.assert_awaited_once_with(values_list=[post_save(i) for i in range(1, 4)])
+    session.commit.assert_awaited_once()
+
+
+async def test_full_batch_flushes_without_waiting(dao, session_maker):
+    dao_impl, dao_class = dao
+    maker, session = session_maker
+    coalescer = InsertCoalescer(dao=dao_class, window=60, max_batch=2, session_maker=maker)
+
+    posts = await asyncio.wait_for(asyncio.gather(*(coalescer.add(post_save(i)) for i in range(1, 5))), timeout=1)
+
+    assert [post.id for post in posts] == [10, 20, 30, 40]
+    assert session.commit.await_count == 2
+
+
+async def test_failed_batch_retried_one_by_one(dao, session_maker):
+    dao_impl, dao_class = dao
+    maker, _ = session_maker
+
+    async def fail_on_user_2(values_list):
+        if any(values.user_id == 2 for values in values_list):
+            raise TransactionError()
+        return saved(values_list)
+
+    dao_impl.add_records_in_order.side_effect = fail_on_user_2
+    coalescer = InsertCoalescer(dao=dao_class, window=0.01, max_batch=100, session_maker=maker)
+
+    results = await asyncio.gather(*(coalescer.add(post_save(i)) for i in range(1, 4)), return_exceptions=True)
+
+    assert results[0].id == 10
+    assert isinstance(results[1], TransactionError)
+    assert results[2].id == 30
+    assert dao_impl.add_records_in_order.await_count == 4
+
+
+async def test_drain_flushes_pending(dao, session_maker):
+    dao_impl, dao_class = dao
+    maker, _ = session_maker
+    coalescer = InsertCoalescer(dao=dao_class, window=60, max_batch=100, session_maker=maker)
+
+    pending = asyncio.create_task(coalescer.add(post_save(1)))
+    await asyncio.sleep(0)
+    await coalescer.drain()
+
+    assert (await pending).id == 10
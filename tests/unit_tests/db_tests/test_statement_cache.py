@@ -0,0 +1,49 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.dao.user_dao import UserDAO
+from src.dao.post_dao import PostDAO
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock())
+    return session
+
+
+@pytest.mark.asyncio
+async def test_statement_reused_for_same_filter_shape(session):
+    dao = UserDAO(session)
+
+    await dao.find_one_or_none(filters={"email": "a@a.io"})
+    await dao.find_one_or_none(filters={"email": "b@b.io"})
+
+    (first, first_params), (second, second_params) = [c.args for c in session.execute.call_args_list]
+    assert first is second
+    assert first_params == {"filter_email": "a@a.io"}
+    assert second_params == {"filter_email": "b@b.io"}
+
+
+@pytest.mark.asyncio
+async def test_statement_keyed_by_model_and_filters(session):
+    await UserDAO(session).find_one_or_none_by_id(data_id=1)
+    await PostDAO(session).find_one_or_none_by_id(data_id=1)
+    await UserDAO(session).find_one_or_none(filters={"username": "u", "email": "e"})
+    await UserDAO(session).find_one_or_none(filters={"email": "e", "username": "u"})
+
+    stmts = [c.args[0] for c in session.execute.call_args_list]
+    assert stmts[0] is not stmts[1]
+    assert stmts[2] is stmts[3]
+
+
+@pytest.mark.asyncio
+async def test_none_filter_is_not_cached(session):
+    dao = PostDAO(session)
+
+    await dao.find_one_or_none(filters={"author": None})
+
+    stmt, params = session.execute.call_args.args
+    assert params is None
+    assert "IS NULL" in str(stmt)
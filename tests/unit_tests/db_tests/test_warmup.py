@@ -0,0 +1,25 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from src.db.warmup import warm_up_until_ready
+from src.errors.data_exeptions import TransactionError
+
+
+async def test_ready_after_successful_warm_up():
+    ready = asyncio.Event()
+    with patch("src.db.warmup.warm_up_pool", AsyncMock(side_effect=[TransactionError(), OSError(), None])) as warm_up:
+        await warm_up_until_ready(connections=3, retry_interval=0, ready=ready)
+
+    assert ready.is_set()
+    assert warm_up.await_count == 3
+    warm_up.assert_awaited_with(3)
+
+
+async def test_not_ready_while_warm_up_fails():
+    ready = asyncio.Event()
+    with patch("src.db.warmup.warm_up_pool", AsyncMock(side_effect=OSError())):
+        task = asyncio.create_task(warm_up_until_ready(connections=1, retry_interval=0, ready=ready))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    assert not ready.is_set()
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.db.models import PURGE_DONE, PURGE_FAILED
+from src.errors.data_exeptions import TransactionError
+from src.jobs.post_purge import purge_user_posts, resume_post_purges
+
+
+@pytest.fixture
+def mock_dao():
+    with patch("src.jobs.post_purge.PostPurgeDAO") as mock_purge_dao, \
+            patch("src.jobs.post_purge.async_session_maker", MagicMock()), \
+            patch("src.jobs.post_purge.entity_cache", None), \
+            patch("src.jobs.post_purge.settings.POST_PURGE_CHUNK_SIZE", 2), \
+            patch("src.jobs.post_purge.settings.POST_PURGE_LEASE_SECONDS", 30):
+        mock_dao_impl = AsyncMock()
+        mock_purge_dao.return_value = mock_dao_impl
+        yield mock_dao_impl
+
+
+async def test_purge_deletes_in_chunks(mock_dao):
+    mock_dao.claim.return_value = True
+    mock_dao.delete_posts_chunk.side_effect = [[1, 2], [3], []]
+
+    await purge_user_posts(7)
+
+    assert mock_dao.delete_posts_chunk.call_count == 3
+    mock_dao.claim.assert_called_once_with(user_id=7, lease=timedelta(seconds=30))
+    mock_dao.delete_posts_chunk.assert_called_with(user_id=7, limit=2, lease=timedelta(seconds=30))
+    mock_dao.finish.assert_called_once_with(user_id=7, status=PURGE_DONE)
+
+
+async def test_purge_records_failure(mock_dao):
+    mock_dao.claim.return_value = True
+    mock_dao.delete_posts_chunk.side_effect = [[1, 2], TransactionError()]
+
+    await purge_user_posts(7)
+
+    mock_dao.finish.assert_called_once_with(user_id=7, status=PURGE_FAILED, error="TransactionError()")
+
+
+async def test_purge_skips_finished(mock_dao):
+    mock_dao.claim.return_value = False
+
+    await purge_user_posts(7)
+
+    mock_dao.delete_posts_chunk.assert_not_called()
+    mock_dao.finish.assert_not_called()
+
+
+async def test_resume_submits_unfinished(mock_dao):
+    mock_dao.find_unfinished_user_ids.return_value = [3, 5]
+    queue = MagicMock()
+
+    assert await resume_post_purges(queue) == 2
+    assert [call.args for call in queue.submit.call_args_list] == [(purge_user_posts, 3), (purge_user_posts, 5)]
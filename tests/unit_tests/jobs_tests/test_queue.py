@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+from src.jobs.queue import JobQueue, BACKGROUND_JOBS
+
+
+@pytest.fixture
+async def queue():
+    queue = JobQueue(workers=2)
+    queue.start()
+    yield queue
+    await queue.stop()
+
+
+async def test_runs_submitted_jobs(queue):
+    done = []
+
+    async def record(value):
+        done.append(value)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    errors_before = BACKGROUND_JOBS._values.get(("broken", "error"), 0)
+    queue.submit(broken)
+    queue.submit(record, 1)
+    queue.submit(record, 2)
+    await queue.join()
+
+    assert sorted(done) == [1, 2]
+    assert BACKGROUND_JOBS._values[("broken", "error")] == errors_before + 1
+
+
+async def test_submit_without_workers_is_dropped(caplog):
+    async def job(): ...
+
+    JobQueue(workers=1).submit(job, 1)
+
+    assert "dropped" in caplog.text
+
+
+@pytest.mark.parametrize("commit, expected", [(True, [1]), (False, [])])
+async def test_submit_after_commit(queue, commit, expected):
+    done = []
+
+    async def record(value):
+        done.append(value)
+
+    sync_session = Session()
+    queue.submit_after_commit(SimpleNamespace(sync_session=sync_session), record, 1)
+    sync_session.begin()
+    if commit:
+        sync_session.commit()
+    else:
+        sync_session.rollback()
+    await queue.join()
+
+    assert done == expected
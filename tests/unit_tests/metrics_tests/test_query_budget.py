@@ -0,0 +1,63 @@
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api.user_router import router as user_router
+from src.metrics.db import count_queries, record_query
+from src.metrics.middleware import MetricsMiddleware
+from src.metrics.query_budget import query_budget, route_query_budget
+
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/within", dependencies=[query_budget(2)])
+async def within_budget():
+    record_query(0.001, "SELECT 1")
+
+
+@app.get("/over", dependencies=[query_budget(1)])
+async def over_budget():
+    for _ in range(3):
+        record_query(0.001, "SELECT 1")
+
+
+def test_count_queries_is_nested():
+    with count_queries() as outer:
+        record_query(0.001, "SELECT 1")
+        with count_queries(record_statements=True) as inner:
+            record_query(0.001, "SELECT 2")
+
+    assert outer.queries == 2
+    assert inner.queries == 1
+    assert inner.statements == ["SELECT 2"]
+
+
+def test_assert_max_queries_fixture(assert_max_queries):
+    with assert_max_queries(1):
+        record_query(0.001, "SELECT 1")
+
+    with pytest.raises(AssertionError):
+        with assert_max_queries(1):
+            record_query(0.001, "SELECT 1")
+            record_query(0.001, "SELECT 2")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, warned", [("/within", False), ("/over", True)])
+async def test_middleware_warns_over_budget(caplog, path, warned):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        with caplog.at_level(logging.WARNING, logger="src.metrics.middleware"):
+            await client.get(path)
+
+    assert ("budget is 1" in caplog.text) is warned
+
+
+def test_routes_declare_budgets():
+    budgets = {route.path: route_query_budget(route) for route in user_router.routes}
+
+    assert budgets["/users/{user_id}"] == 2
+    assert all(budget is not None for budget in budgets.values())
@@ -0,0 +1,42 @@
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.metrics.db import InstrumentedAsyncQueuePool
+from src.metrics.registry import Registry, Counter, Histogram, GaugeCollector
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency", labels=("route",), buckets=(0.1, 1.0))
+    )
+    histogram.observe(0.05, "/posts")
+    histogram.observe(0.5, "/posts")
+    histogram.observe(5.0, "/posts")
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/posts",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/posts",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/posts",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/posts"} 3' in lines
+
+
+def test_counter_and_collector():
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests", labels=("status",)))
+    registry.register(GaugeCollector("pool_size", "Pool", ("engine",), lambda: {("primary",): 5}))
+    counter.inc("200")
+    counter.inc("200")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{status="200"} 2.0' in lines
+    assert 'pool_size{engine="primary"} 5' in lines
+
+
+def test_pool_keeps_metrics_name_after_dispose():
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost/db", poolclass=InstrumentedAsyncQueuePool)
+    engine.pool._metrics_name = "replica_9"
+
+    assert engine.pool.recreate()._metrics_name == "replica_9"
@@ -0,0 +1,97 @@
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from src.errors.service_exeptions import TooManyRequestsError
+from src.main import app
+from src.ratelimit.admission import AdmissionController
+from src.ratelimit.backend import Bucket, MemoryRateLimitBackend, SQLiteRateLimitBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_controller(backend, max_concurrency=10, ip_burst=10, account_burst=10) -> AdmissionController:
+    return AdmissionController(
+        backend=backend, max_concurrency=max_concurrency,
+        ip_rate=1.0, ip_burst=ip_burst, account_rate=1.0, account_burst=account_burst,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend_cls", ["memory", "sqlite"])
+async def test_token_bucket(tmp_path, backend_cls):
+    clock = FakeClock()
+    if backend_cls == "memory":
+        backend = MemoryRateLimitBackend(clock=clock)
+    else:
+        backend = SQLiteRateLimitBackend(path=str(tmp_path / "rl.sqlite3"), idle_ttl=60, clock=clock)
+    bucket = [Bucket("login:ip:1.2.3.4", rate=0.5, burst=2)]
+
+    assert await backend.acquire(bucket) is None
+    assert await backend.acquire(bucket) is None
+    assert await backend.acquire(bucket) == pytest.approx(2.0)
+    clock.now += 2
+    assert await backend.acquire(bucket) is None
+
+
+@pytest.mark.asyncio
+async def test_buckets_are_taken_all_or_nothing():
+    backend = MemoryRateLimitBackend(clock=FakeClock())
+    ip, account = Bucket("ip", rate=1.0, burst=5), Bucket("account", rate=1.0, burst=1)
+
+    assert await backend.acquire([ip, account]) is None
+    assert await backend.acquire([ip, account]) is not None
+    for _ in range(4):
+        assert await backend.acquire([ip]) is None
+    assert await backend.acquire([ip]) is not None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_state_is_shared(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "rl.sqlite3")
+    workers = [SQLiteRateLimitBackend(path=path, idle_ttl=60, clock=clock) for _ in range(2)]
+    bucket = [Bucket("register:ip:1.2.3.4", rate=1.0, burst=1)]
+
+    assert await workers[0].acquire(bucket) is None
+    assert await workers[1].acquire(bucket) is not None
+    for worker in workers:
+        worker.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    controller = make_controller(backend=None, max_concurrency=1)
+
+    async with controller.admit("login", "1.2.3.4"):
+        with pytest.raises(TooManyRequestsError):
+            async with controller.admit("login", "5.6.7.8"):
+                pass
+    async with controller.admit("login", "1.2.3.4"):
+        assert controller.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_before_hashing():
+    controller = make_controller(MemoryRateLimitBackend(), account_burst=1)
+    with patch("src.dependencies.admission_dep.admission_controller", controller), \
+            patch("src.auth.service.AuthService.login_user", AsyncMock(return_value={
+                "access_token": "a", "refresh_token": "r"
+            })) as login_user:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            form = {"username": "User@Example.com", "password": "password1!"}
+            first = await client.post("/auth/login", data=form)
+            form["username"] = "user@example.com"
+            second = await client.post("/auth/login", data=form)
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "1"
+    assert login_user.await_count == 1
@@ -1,11 +1,14 @@
-from unittest.mock import patch, AsyncMock
+from collections import namedtuple
+from datetime import datetime, timezone
+from unittest.mock import patch, AsyncMock, MagicMock
 
 import pytest, pytest_asyncio
 
 from src.schemas.post_schema import BasePost, PostResponse, PostSave
-from src.errors.service_exeptions import PermissionDenied
+from src.errors.service_exeptions import PermissionDenied, InvalidCursorError
 from src.errors.data_exeptions import PostNotFoundError
 from src.service.post_service import PostService
+from src.schemas.pagination_schema import decode_cursor, encode_cursor
 from src.db.models import Post
 
 
@@ -31,16 +34,114 @@ async def test_create_post(mock_post_dao):
     assert result.author == "grisha"
 
 
-# @patch("src.service.post_service.PostDAO")
-# @pytest.mark.asyncio
-#     "после добавления пагинации"
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_create_post_through_coalescer(mock_post_dao):
+    mock_dao = AsyncMock()
+    mock_post_dao.return_value = mock_dao
+    coalescer = AsyncMock()
+    coalescer.add.return_value = Post(id=1, user_id=1, title="a", text="a", author="grisha")
+
+    post_service = PostService(session=None, coalescer=coalescer)
+
+    result = await post_service.create_post(
+        user_id=1, author="grisha", post=BasePost(title="a", text="a")
+    )
+
+    coalescer.add.assert_awaited_once_with(PostSave(title="a", text="a", user_id=1, author="grisha"))
+    mock_dao.add_one_record.assert_not_called()
+    assert result.id == 1
+
+
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_get_all_posts_pagination(mock_post_dao):
+    created_at = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    mock_dao = AsyncMock()
+    mock_dao.find_page_by_filters.return_value = [
+        Post(id=i, user_id=1, title="a", text="a", author="grisha", created_at=created_at)
+        for i in range(1, 4)
+    ]
+    mock_post_dao.return_value = mock_dao
+
+    post_service = PostService(session=None)
+
+    after = encode_cursor(created_at, 0)
+    result = await post_service.get_all_posts(limit=2, after=after)
+    mock_dao.find_page_by_filters.assert_called_once_with(
+        limit=3, after=(created_at, 0)
+    )
+
+    assert [post.id for post in result.items] == [1, 2]
+    assert decode_cursor(result.next_cursor) == (created_at, 2)
+
+
+SearchRow = namedtuple("SearchRow", ["Post", "rank", "headline"])
+
+
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_search_posts_pagination(mock_post_dao):
+    mock_dao = AsyncMock()
+    mock_dao.search.return_value = [
+        SearchRow(Post(id=i, user_id=1, title="a", text="a", author="grisha"), 1.0 / i, "<b>a</b>")
+        for i in range(1, 4)
+    ]
+    mock_post_dao.return_value = mock_dao
+
+    post_service = PostService(session=None)
+
+    result = await post_service.search_posts(query="a", limit=2, after=encode_cursor(2.0, 0, dump=float))
+    mock_dao.search.assert_called_once_with(query="a", limit=3, after=(2.0, 0))
+
+    assert [(post.id, post.headline) for post in result.items] == [(1, "<b>a</b>"), (2, "<b>a</b>")]
+    assert decode_cursor(result.next_cursor, load=float) == (0.5, 2)
+
+
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_get_all_posts_last_page(mock_post_dao):
+    mock_dao = AsyncMock()
+    mock_dao.find_page_by_filters.return_value = [
+        Post(id=1, user_id=1, title="a", text="a", author="grisha")
+    ]
+    mock_post_dao.return_value = mock_dao
+
+    post_service = PostService(session=None)
+
+    result = await post_service.get_all_posts(limit=2)
+
+    assert len(result.items) == 1
+    assert result.next_cursor is None
+
+
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_get_all_posts_with_invalid_cursor(mock_post_dao):
+    mock_post_dao.return_value = AsyncMock()
+
+    post_service = PostService(session=None)
+
+    with pytest.raises(InvalidCursorError):
+        await post_service.get_all_posts(after="not-a-cursor")
+
+
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_search_posts_rejects_created_at_cursor(mock_post_dao):
+    mock_post_dao.return_value = AsyncMock()
+
+    post_service = PostService(session=None)
+
+    with pytest.raises(InvalidCursorError):
+        await post_service.search_posts(query="a", after=encode_cursor(datetime.now(timezone.utc), 1))
 
 
 @patch("src.service.post_service.PostDAO")
 @pytest.mark.asyncio
 async def test_get_all_posts_with_exception(mock_post_dao):
     mock_dao = AsyncMock()
-    mock_dao.find_all_by_filters.side_effect = PostNotFoundError()
+    mock_dao.find_page_by_filters.return_value = []
     mock_post_dao.return_value = mock_dao
 
     post_service = PostService(session=None)
@@ -49,6 +150,26 @@ async def test_get_all_posts_with_exception(mock_post_dao):
         await post_service.get_all_posts()
 
 
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_export_posts(mock_post_dao):
+    async def partitions(fetch_size):
+        yield [Post(id=1, user_id=1, title="a", text="a", author="grisha")]
+        yield [Post(id=2, user_id=1, title="b", text="b", author="grisha")]
+
+    mock_dao = MagicMock()
+    mock_dao.stream_all_by_filters.side_effect = partitions
+    mock_post_dao.return_value = mock_dao
+
+    post_service = PostService(session=None)
+
+    chunks = [chunk async for chunk in post_service.export_posts(fetch_size=1)]
+    mock_dao.stream_all_by_filters.assert_called_once_with(fetch_size=1)
+
+    assert len(chunks) == 2
+    assert PostResponse.model_validate_json(chunks[1].splitlines()[0]).id == 2
+
+
 @patch("src.service.post_service.PostDAO")
 @pytest.mark.asyncio
 async def test_get_post_with_exception(mock_post_dao):
@@ -66,9 +187,8 @@ async def test_get_post_with_exception(mock_post_dao):
 @pytest.mark.asyncio
 async def test_update_post(mock_post_dao):
     mock_dao = AsyncMock()
-    mock_dao.check_exictence.return_value = True
-    mock_dao.update_record.return_value = Post(
-        id=1, user_id=1, title="b", text="b", author="grisha"
+    mock_dao.update_owned_post.return_value = (
+        True, Post(id=1, user_id=1, title="b", text="b", author="grisha")
     )
 
     mock_post_dao.return_value = mock_dao
@@ -76,8 +196,8 @@ async def test_update_post(mock_post_dao):
 
     new_post = BasePost(title="b", text="b")
     result = await post_service.update_post(1, 1, post=new_post)
-    mock_dao.update_record.assert_called_once_with(
-        values=new_post, filters={"id": 1, "user_id": 1}
+    mock_dao.update_owned_post.assert_called_once_with(
+        post_id=1, user_id=1, values=new_post
     )
 
     assert result.title == "b"
@@ -87,7 +207,7 @@ async def test_update_post(mock_post_dao):
 @pytest.mark.asyncio
 async def test_update_post_with_not_found_error(mock_post_dao):
     mock_dao = AsyncMock()
-    mock_dao.check_existence.return_value = False
+    mock_dao.update_owned_post.return_value = (False, None)
 
     mock_post_dao.return_value = mock_dao
     post_service = PostService(session=None)
@@ -100,8 +220,7 @@ async def test_update_post_with_not_found_error(mock_post_dao):
 @pytest.mark.asyncio
 async def test_update_post_with_permission_error(mock_post_dao):
     mock_dao = AsyncMock()
-    mock_dao.check_existence.return_value = True
-    mock_dao.update_record.return_value = None
+    mock_dao.update_owned_post.return_value = (True, None)
 
     mock_post_dao.return_value = mock_dao
     post_service = PostService(session=None)
@@ -114,7 +233,7 @@ async def test_update_post_with_permission_error(mock_post_dao):
 @pytest.mark.asyncio
 async def test_delete_post_with_not_found_error(mock_post_dao):
     mock_dao = AsyncMock()
-    mock_dao.check_existence.return_value = False
+    mock_dao.delete_owned_post.return_value = (False, False)
 
     mock_post_dao.return_value = mock_dao
     post_service = PostService(session=None)
@@ -127,11 +246,52 @@ async def test_delete_post_with_not_found_error(mock_post_dao):
 @pytest.mark.asyncio
 async def test_delete_post_with_permission_error(mock_post_dao):
     mock_dao = AsyncMock()
-    mock_dao.check_existence.return_value = True
-    mock_dao.delete_records.return_value = 0
+    mock_dao.delete_owned_post.return_value = (True, False)
 
     mock_post_dao.return_value = mock_dao
     post_service = PostService(session=None)
 
     with pytest.raises(PermissionDenied):
         await post_service.delete_post(1, 1)
+
+
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_create_posts_reports_invalid_items(mock_post_dao):
+    mock_dao = AsyncMock()
+    mock_dao.add_many_records.return_value = [
+        Post(id=1, user_id=1, title="a", text="a", author="grisha")
+    ]
+    mock_post_dao.return_value = mock_dao
+
+    post_service = PostService(session=None)
+
+    result = await post_service.create_posts(
+        user_id=1, author="grisha", posts=[{"title": "a", "text": "a"}, {"text": "b"}]
+    )
+    mock_dao.add_many_records.assert_called_once_with(
+        values_list=[PostSave(title="a", text="a", user_id=1, author="grisha")]
+    )
+    mock_dao.copy_many_records.assert_not_called()
+
+    assert [post.id for post in result.posts] == [1]
+    assert [error.index for error in result.errors] == [1]
+
+
+@patch("src.service.post_service.settings")
+@patch("src.service.post_service.PostDAO")
+@pytest.mark.asyncio
+async def test_create_posts_uses_copy_above_threshold(mock_post_dao, mock_settings):
+    mock_settings.BATCH_COPY_THRESHOLD = 2
+    mock_dao = AsyncMock()
+    mock_dao.copy_many_records.return_value = []
+    mock_post_dao.return_value = mock_dao
+
+    post_service = PostService(session=None)
+
+    await post_service.create_posts(
+        user_id=1, author="grisha", posts=[{"title": "a", "text": "a"}] * 2
+    )
+
+    mock_dao.copy_many_records.assert_called_once()
+    mock_dao.add_many_records.assert_not_called()
@@ -1,4 +1,6 @@
-from unittest.mock import patch, AsyncMock
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock
 
 import pytest, pytest_asyncio
 
@@ -10,14 +12,17 @@ from src.schemas.user_schema import (
     UserUpdate,
 )
 from src.schemas.post_schema import PostResponse
+from src.schemas.pagination_schema import decode_cursor
 from src.errors.service_exeptions import (
     UserInactiveError,
     UserDeletionIntegrityError,
     InvalidCredentialsError,
 )
-from src.errors.data_exeptions import UserNotFoundError
+from src.errors.data_exeptions import UserNotFoundError, PostPurgeNotFoundError
 from src.service.user_service import UserService
-from src.db.models import User, Post
+from src.cache.entity_cache import user_key, user_posts_key
+from src.db.models import User, Post, PostPurge
+from src.jobs.post_purge import purge_user_posts
 
 
 @pytest.fixture(scope="function")
@@ -38,13 +43,24 @@ posts = [
     PostResponse(id=1, title="a", text="a", user_id=1, author="grisha"),
     PostResponse(id=2, title="a", text="a", user_id=1, author="grisha"),
 ]
-user_with_posts = User(
-    id=1,
-    is_active=True,
-    username="grisha",
-    email="grishak@gmail.com",
-    posts=posts_from_db,
-)
+
+
+@pytest.mark.asyncio
+async def test_change_password_invalidates_user_posts(mock_dao):
+    # updated_at пользователя входит в версию GET /users/{id}/posts
+    mock_dao.find_one_or_none_by_id.return_value = active_user
+    mock_dao.update_record.return_value = active_user
+    cache = MagicMock()
+    session = object()
+    user_service = UserService(session=session, cache=cache)
+
+    with patch("src.service.user_service.verify_password_async", AsyncMock(return_value=True)), \
+            patch("src.service.user_service.create_password_hash_async", AsyncMock(return_value="hash")):
+        await user_service.change_password(
+            1, ChangePassword(password="aaaaaaaa", new_password="1a$aaaaa", confirm_password="1a$aaaaa")
+        )
+
+    cache.invalidate_after_commit.assert_called_once_with(session, user_key(1), user_posts_key(1))
 
 
 @pytest.mark.asyncio
@@ -77,10 +93,10 @@ async def test_get_user_by_id_with_exceptions(
 @pytest.mark.parametrize(
     "mock_return_value, posts, expected_exc",
     [
-        (unactive_user, None, UserInactiveError),
-        (None, None, UserNotFoundError),
-        (active_user, list(), None),
-        (user_with_posts, posts, None),
+        ((unactive_user, []), None, UserInactiveError),
+        ((None, []), None, UserNotFoundError),
+        ((active_user, []), list(), None),
+        ((active_user, posts_from_db), posts, None),
     ],
 )
 async def test_get_user_with_posts(mock_dao, mock_return_value, posts, expected_exc):
@@ -93,10 +109,54 @@ async def test_get_user_with_posts(mock_dao, mock_return_value, posts, expected_
             await user_service.get_user_with_posts(1)
     else:
         result = await user_service.get_user_with_posts(1)
-        mock_dao.get_user_with_posts.assert_called_once_with(user_id=1)
+        mock_dao.get_user_with_posts.assert_called_once_with(user_id=1, limit=21, after=None)
 
         assert isinstance(result, UserWithPosts)
         assert result.posts == posts
+        assert result.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_with_posts_next_cursor(mock_dao):
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    page = [
+        Post(id=1, title="a", text="a", user_id=1, author="grisha", created_at=created_at),
+        Post(id=2, title="a", text="a", user_id=1, author="grisha", created_at=created_at),
+    ]
+    mock_dao.get_user_with_posts.return_value = (active_user, page)
+
+    user_service = UserService(session=None)
+    first = await user_service.get_user_with_posts(1, limit=1)
+    await user_service.get_user_with_posts(1, limit=1, after=first.next_cursor)
+
+    assert first.posts == posts[:1]
+    assert decode_cursor(first.next_cursor) == (created_at, 1)
+    assert mock_dao.get_user_with_posts.call_args.kwargs == {
+        "user_id": 1, "limit": 2, "after": (created_at, 1)
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_user_posts_version(mock_dao):
+    updated_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    page = [
+        SimpleNamespace(id=i, created_at=updated_at, post_updated_at=updated_at) for i in (1, 2)
+    ]
+    mock_dao.get_user_posts_versions.return_value = (updated_at, page)
+
+    user_service = UserService(session=None)
+    version = await user_service.get_user_posts_version(1, limit=1)
+
+    mock_dao.get_user_posts_versions.assert_called_once_with(user_id=1, limit=2, after=None)
+    assert version[:2] == (updated_at, [(1, updated_at)])
+    assert decode_cursor(version[2]) == (updated_at, 1)
+
+
+@pytest.mark.asyncio
+async def test_get_user_posts_version_missing_user(mock_dao):
+    mock_dao.get_user_posts_versions.return_value = (None, [])
+
+    assert await UserService(session=None).get_user_posts_version(1) is None
 
 
 @pytest.mark.asyncio
@@ -105,8 +165,7 @@ async def test_get_user_with_posts(mock_dao, mock_return_value, posts, expected_
     [(None, UserNotFoundError), ([active_user, unactive_user], None)],
 )
 async def test_get_all_users(mock_dao, mock_return_value, expected_exc):
-    """Добавить пагинацию"""
-    mock_dao.find_all_by_filters.return_value = mock_return_value
+    mock_dao.find_page_by_filters.return_value = mock_return_value
 
     user_service = UserService(session=None)
 
@@ -115,8 +174,12 @@ async def test_get_all_users(mock_dao, mock_return_value, expected_exc):
             await user_service.get_all_users()
     else:
         result = await user_service.get_all_users()
+        mock_dao.find_page_by_filters.assert_called_once_with(
+            limit=21, after=None, filters={"is_active": True}
+        )
 
-        assert result == [UserResponse.model_validate(active_user)]
+        assert result.items == [UserResponse.model_validate(active_user)]
+        assert result.next_cursor is None
 
 
 @pytest.mark.asyncio
@@ -165,7 +228,7 @@ async def test_change_password(
     user_service = UserService(session=None)
 
     with patch(
-        "src.service.user_service.verify_password",
+        "src.service.user_service.verify_password_async",
         side_effect=lambda t, d: mock_verify_func,
     ):
         if expected_exc:
@@ -180,7 +243,7 @@ async def test_change_password(
                 )
         else:
             with patch(
-                "src.service.user_service.create_password_hash",
+                "src.service.user_service.create_password_hash_async",
                 side_effect=lambda *args, **kwargs: mock_create_func,
             ):
                 result = await user_service.change_password(
@@ -202,17 +265,35 @@ async def test_change_password(
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "mock_return_value, expected_exc",
-    [((2, 0), UserDeletionIntegrityError), ((1, 0), None)],
+    [(2, UserDeletionIntegrityError), (1, None)],
 )
 async def test_deactive_user(mock_dao, mock_return_value, expected_exc):
     mock_dao.deactive_user.return_value = mock_return_value
-    user_service = UserService(session=None)
+    session = object()
+    user_service = UserService(session=session)
 
-    if expected_exc:
-        with pytest.raises(expected_exc):
-            await user_service.deactive_user(1)
-    else:
-        result = await user_service.deactive_user(1)
-        mock_dao.deactive_user.assert_called_once_with(user_id=1)
+    with patch("src.service.user_service.job_queue") as mock_queue:
+        if expected_exc:
+            with pytest.raises(expected_exc):
+                await user_service.deactive_user(1)
+            mock_queue.submit_after_commit.assert_not_called()
+        else:
+            result = await user_service.deactive_user(1)
+            mock_dao.deactive_user.assert_called_once_with(user_id=1)
+            mock_queue.submit_after_commit.assert_called_once_with(session, purge_user_posts, 1)
+
+            assert result is None
+
+
+@pytest.mark.asyncio
+async def test_get_post_purge():
+    purge = PostPurge(user_id=1, status="running", deleted=10, error=None, updated_at=datetime.now(timezone.utc))
+    with patch("src.service.user_service.PostPurgeDAO") as mock_purge_dao:
+        mock_purge_dao.return_value.get_progress = AsyncMock(side_effect=[(purge, 5), None])
+        user_service = UserService(session=None)
+
+        progress = await user_service.get_post_purge(1)
+        with pytest.raises(PostPurgeNotFoundError):
+            await user_service.get_post_purge(1)
 
-        assert result is None
+    assert (progress.status, progress.deleted, progress.remaining) == ("running", 10, 5)